@@ -1,39 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from typing import List, Optional
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from ....models import schemas, models
-from ....models.database import get_db
-from ....services import analysis_service
+from ...models import schemas, models
+from ...models.database import get_async_db
+from ...services import analysis_service
+from ...services.analytics_rollup import category_sums
+from ...services.pagination import next_cursor, paginate_sessions
 
 router = APIRouter()
 
+def _paginate(query, limit: int, skip: int = 0, after: Optional[str] = None):
+    try:
+        return paginate_sessions(query, limit, skip, after)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {e}"
+        )
+
+def _set_next_cursor(response: Response, sessions, limit: int) -> None:
+    cursor = next_cursor(sessions, limit)
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
+
 @router.get("/sessions", response_model=List[schemas.Session])
 async def get_sessions(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve a list of analysis sessions with pagination.
+    
+    Pass the X-Next-Cursor header of a page as `after` to get the next one
+    (keyset pagination); `skip` still works but gets slower for deep pages.
     """
-    sessions = db.query(models.Session).order_by(
-        models.Session.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    query = select(models.Session).options(
+        selectinload(models.Session.feedbacks)
+    )
+    sessions = (await db.scalars(_paginate(query, limit, skip, after))).all()
+    _set_next_cursor(response, sessions, limit)
     return sessions
 
 @router.get("/sessions/{session_id}", response_model=schemas.Session)
 async def get_session(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get details of a specific analysis session by ID.
     """
-    session = db.query(models.Session).filter(
-        models.Session.id == session_id
-    ).first()
+    session = await db.scalar(
+        select(models.Session).options(
+            selectinload(models.Session.feedbacks)
+        ).where(
+            models.Session.id == session_id
+        )
+    )
     
     if not session:
         raise HTTPException(
@@ -46,38 +75,42 @@ async def get_session(
 @router.get("/sessions/user/{user_id}", response_model=List[schemas.Session])
 async def get_user_sessions(
     user_id: str,
+    response: Response,
     days: Optional[int] = 30,
     limit: Optional[int] = 10,
-    db: Session = Depends(get_db)
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get sessions for a specific user, with optional date range filtering.
+    
+    Pass the X-Next-Cursor header of a page as `after` to get the next one.
     """
-    query = db.query(models.Session).filter(
+    query = select(models.Session).options(
+        selectinload(models.Session.feedbacks)
+    ).where(
         models.Session.user_id == user_id
     )
     
     if days:
         date_threshold = datetime.utcnow() - timedelta(days=days)
-        query = query.filter(models.Session.created_at >= date_threshold)
-    
-    sessions = query.order_by(
-        models.Session.created_at.desc()
-    ).limit(limit).all()
+        query = query.where(models.Session.created_at >= date_threshold)
     
+    sessions = (await db.scalars(_paginate(query, limit, after=after))).all()
+    _set_next_cursor(response, sessions, limit)
     return sessions
 
 @router.get("/sessions/{session_id}/feedback", response_model=List[schemas.Feedback])
 async def get_session_feedback(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all feedback for a specific session.
     """
-    feedback = db.query(models.Feedback).filter(
+    feedback = (await db.scalars(select(models.Feedback).where(
         models.Feedback.session_id == session_id
-    ).all()
+    ))).all()
     
     if not feedback:
         raise HTTPException(
@@ -91,64 +124,48 @@ async def get_session_feedback(
 async def get_user_analytics(
     user_id: str,
     days: Optional[int] = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get analytics for a specific user.
+    
+    Everything is computed with grouped SQL aggregates; category scores
+    come from the per-day analytics rollup, so the cost grows with the
+    number of days rather than the number of feedback rows.
     """
     # Calculate date threshold
     date_threshold = datetime.utcnow() - timedelta(days=days)
-    
-    # Get all sessions for the user
-    sessions = db.query(models.Session).filter(
+    in_period = (
         models.Session.user_id == user_id,
         models.Session.created_at >= date_threshold
-    ).all()
+    )
+    
+    # Session count and total duration in one query
+    total_sessions, total_duration = (await db.execute(
+        select(
+            func.count(models.Session.id),
+            func.coalesce(func.sum(models.Session.duration_seconds), 0)
+        ).where(*in_period)
+    )).one()
     
-    if not sessions:
+    if not total_sessions:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No sessions found for this user in the specified time period"
         )
     
-    # Get all feedback for these sessions
-    session_ids = [session.id for session in sessions]
-    feedback_items = db.query(models.Feedback).filter(
-        models.Feedback.session_id.in_(session_ids)
-    ).all()
-    
-    # Calculate metrics
-    total_sessions = len(sessions)
-    total_duration = sum(session.duration_seconds for session in sessions)
+    # Per-category average and least-squares sums, x being the session time in
+    # days; whole days are read from the analytics rollup
+    sums = await category_sums(db, user_id, date_threshold)
     
     # Calculate average scores by category
     scores = {}
-    for item in models.AnalysisType:
-        category_feedback = [f for f in feedback_items if f.analysis_type == item.value]
-        if category_feedback:
-            scores[item.value] = sum(f.score for f in category_feedback) / len(category_feedback)
-    
-    # Calculate improvement over time (simple linear regression)
+    # Calculate improvement over time (simple linear regression), as score change per day
     improvement = {}
-    for item in models.AnalysisType:
-        category_scores = [
-            (s.created_at, f.score)
-            for s in sessions
-            for f in s.feedbacks
-            if f.analysis_type == item.value
-        ]
-        if len(category_scores) > 1:
-            # Simple linear regression to calculate improvement trend
-            x = [(dt - category_scores[0][0]).total_seconds() for dt, _ in category_scores]
-            y = [score for _, score in category_scores]
-            n = len(x)
-            x_sum = sum(x)
-            y_sum = sum(y)
-            xy_sum = sum(xi * yi for xi, yi in zip(x, y))
-            x_sq_sum = sum(xi ** 2 for xi in x)
-            
-            slope = (n * xy_sum - x_sum * y_sum) / (n * x_sq_sum - x_sum ** 2) if (n * x_sq_sum - x_sum ** 2) != 0 else 0
-            improvement[item.value] = slope * 86400  # Convert to score change per day
+    for analysis_type, category in sums.items():
+        scores[analysis_type.value] = category.average
+        if category.count > 1:
+            improvement[analysis_type.value] = category.slope
     
     return {
         "total_sessions": total_sessions,
@@ -1,21 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
+import json
 
-from ....models.models import Feedback as DBFeedback
-from ....models.schemas import Feedback as FeedbackSchema, FeedbackCreate
-from ....models.database import get_db
+from ...core.config import settings
+from ...models.models import Session as DBSession, Feedback as DBFeedback
+from ...models.schemas import BulkFeedbackError, BulkFeedbackResult, Feedback as FeedbackSchema, FeedbackCreate
+from ...models.database import get_async_db
+from ...services.analytics_rollup import ScorePoint, record_scores
 
-router = APIRouter(prefix="/feedback", tags=["feedback"])
+router = APIRouter()
 
 @router.post("/", response_model=FeedbackSchema)
-def create_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
+async def create_feedback(feedback: FeedbackCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create new feedback for a session
     """
     # Check if session exists
-    session = db.query(DBSession).filter(DBSession.id == feedback.session_id).first()
+    session = await db.get(DBSession, feedback.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -24,31 +29,110 @@ def create_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
         analysis_type=feedback.analysis_type,
         score=feedback.score,
         feedback=feedback.feedback,
-        suggestions=",".join(feedback.suggestions),
+        suggestions=feedback.suggestions,
         created_at=datetime.utcnow()
     )
     
     db.add(db_feedback)
-    db.commit()
-    db.refresh(db_feedback)
+    point = ScorePoint(session.user_id, feedback.analysis_type, session.created_at, feedback.score)
+    await db.run_sync(record_scores, [point])
+    await db.commit()
     return db_feedback
 
+@router.post("/bulk", response_model=BulkFeedbackResult)
+async def create_feedback_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Create many feedback items at once, e.g. when importing past sessions
+    
+    The body is a JSON array of feedback items, or one item per line with
+    Content-Type application/x-ndjson. Sessions are checked with a single
+    query and valid items are inserted in one transaction; invalid items,
+    and NDJSON lines that are not valid JSON, are skipped and reported by
+    their position in the body.
+    """
+    body = await request.body()
+    errors = []
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            raw_items = []
+            for index, line in enumerate(line for line in body.splitlines() if line.strip()):
+                try:
+                    raw_items.append(json.loads(line))
+                except ValueError as e:
+                    errors.append(BulkFeedbackError(index=index, error=f"Invalid JSON: {e}"))
+                    raw_items.append(None)
+        else:
+            raw_items = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid body: {e}")
+    if not isinstance(raw_items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of feedback items")
+    if len(raw_items) > settings.FEEDBACK_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.FEEDBACK_BULK_MAX_ITEMS} items per request")
+    
+    unparsed = {error.index for error in errors}
+    items = []
+    for index, raw in enumerate(raw_items):
+        if index in unparsed:
+            continue
+        try:
+            items.append((index, FeedbackCreate.model_validate(raw)))
+        except ValidationError as e:
+            errors.append(BulkFeedbackError(index=index, error="; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in e.errors()
+            )))
+    
+    # One IN query for every referenced session
+    session_ids = {item.session_id for _, item in items}
+    sessions = {}
+    if session_ids:
+        rows = await db.execute(
+            select(DBSession.id, DBSession.user_id, DBSession.created_at).where(DBSession.id.in_(session_ids))
+        )
+        sessions = {row.id: row for row in rows}
+    
+    now = datetime.utcnow()
+    values = []
+    points = []
+    for index, item in items:
+        session = sessions.get(item.session_id)
+        if session is None:
+            errors.append(BulkFeedbackError(index=index, error=f"Session {item.session_id} not found"))
+            continue
+        values.append({
+            "session_id": item.session_id,
+            "analysis_type": item.analysis_type,
+            "score": item.score,
+            "feedback": item.feedback,
+            "suggestions": item.suggestions,
+            "created_at": now,
+        })
+        points.append(ScorePoint(session.user_id, item.analysis_type, session.created_at, item.score))
+    
+    if values:
+        await db.execute(insert(DBFeedback), values)
+        await db.run_sync(record_scores, points)
+        await db.commit()
+    
+    errors.sort(key=lambda error: error.index)
+    return BulkFeedbackResult(received=len(raw_items), inserted=len(values), failed=len(errors), errors=errors)
+
 @router.get("/session/{session_id}", response_model=List[FeedbackSchema])
-def get_feedback_for_session(session_id: str, db: Session = Depends(get_db)):
+async def get_feedback_for_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get all feedback for a specific session
     """
-    feedbacks = db.query(DBFeedback).filter(DBFeedback.session_id == session_id).all()
+    feedbacks = (await db.scalars(select(DBFeedback).where(DBFeedback.session_id == session_id))).all()
     if not feedbacks:
         raise HTTPException(status_code=404, detail="No feedback found for this session")
     return feedbacks
 
 @router.get("/{feedback_id}", response_model=FeedbackSchema)
-def get_feedback(feedback_id: int, db: Session = Depends(get_db)):
+async def get_feedback(feedback_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a specific feedback by ID
     """
-    feedback = db.query(DBFeedback).filter(DBFeedback.id == feedback_id).first()
+    feedback = await db.get(DBFeedback, feedback_id)
     if feedback is None:
         raise HTTPException(status_code=404, detail="Feedback not found")
     return feedback
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
 import uuid
 from datetime import datetime
 
-from ....models.models import Session as DBSession, Feedback as DBFeedback
-from ....models.schemas import Session as SessionSchema, SessionCreate, Feedback as FeedbackSchema
-from ....models.database import get_db
+from ...models.models import Session as DBSession, Feedback as DBFeedback
+from ...models.schemas import Session as SessionSchema, SessionCreate, Feedback as FeedbackSchema
+from ...models.database import get_async_db
+from ...services.pagination import next_cursor, paginate_sessions
 
-router = APIRouter(prefix="/sessions", tags=["sessions"])
+router = APIRouter()
 
 @router.post("/", response_model=SessionSchema)
-def create_session(session: SessionCreate, db: Session = Depends(get_db)):
+async def create_session(session: SessionCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new debate session
     """
@@ -21,27 +24,46 @@ def create_session(session: SessionCreate, db: Session = Depends(get_db)):
         title=session.title,
         description=session.description,
         duration_seconds=session.duration_seconds,
-        created_at=datetime.utcnow()
+        created_at=datetime.utcnow(),
+        feedbacks=[]
     )
     db.add(db_session)
-    db.commit()
-    db.refresh(db_session)
+    await db.commit()
     return db_session
 
 @router.get("/{session_id}", response_model=SessionSchema)
-def read_session(session_id: str, db: Session = Depends(get_db)):
+async def read_session(session_id: str, db: AsyncSession = Depends(get_async_db)):
     """
     Get a specific session by ID
     """
-    db_session = db.query(DBSession).filter(DBSession.id == session_id).first()
+    db_session = await db.scalar(
+        select(DBSession).options(selectinload(DBSession.feedbacks)).where(DBSession.id == session_id)
+    )
     if db_session is None:
         raise HTTPException(status_code=404, detail="Session not found")
     return db_session
 
 @router.get("/user/{user_id}", response_model=List[SessionSchema])
-def read_user_sessions(user_id: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def read_user_sessions(
+    user_id: str,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Get all sessions for a specific user
+    Get all sessions for a specific user, newest first
+    
+    Pass the X-Next-Cursor header of a page as `after` to get the next one
     """
-    sessions = db.query(DBSession).filter(DBSession.user_id == user_id).offset(skip).limit(limit).all()
+    query = select(DBSession).options(selectinload(DBSession.feedbacks)).where(DBSession.user_id == user_id)
+    try:
+        query = paginate_sessions(query, limit, skip, after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    sessions = (await db.scalars(query)).all()
+    cursor = next_cursor(sessions, limit)
+    if cursor is not None:
+        response.headers["X-Next-Cursor"] = cursor
     return sessions
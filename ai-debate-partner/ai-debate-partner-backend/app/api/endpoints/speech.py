@@ -3,10 +3,11 @@ from typing import Optional
 import uuid
 from datetime import datetime
 
-from ....core.config import settings
-from ....models import schemas
-from ....services import speech_service, analysis_service
-from ....models.database import get_db
+from ...core.config import settings
+from ...models import schemas
+from ...services import speech_service
+from ...services.analysis_service import analysis_service
+from ...models.database import get_db
 
 router = APIRouter()
 
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 class Settings:
     # App settings
@@ -12,9 +12,67 @@ class Settings:
 
     # OpenAI
     OPENAI_API_KEY: str = "your_openai_api_key_here"
+    OPENAI_MODEL: str = "gpt-4"
+    # Point at any OpenAI-compatible server (e.g. a local stub); None uses the OpenAI API
+    OPENAI_BASE_URL: Optional[str] = None
+
+    # Shared LLM client: at most LLM_MAX_CONCURRENCY requests in flight, each
+    # call bounded by LLM_TIMEOUT_SECONDS overall, retrying transient errors up
+    # to LLM_MAX_RETRIES times with jittered exponential backoff
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_SECONDS: float = 0.5
+    LLM_RETRY_MAX_SECONDS: float = 8.0
+
+    # Live AI replies streamed over the WebSocket as ai_reply_delta messages
+    # (sessions can also opt in with "stream_ai_reply": true in connection_init);
+    # otherwise the heuristic reply is sent inside analysis_update
+    AI_REPLY_STREAMING: bool = False
+    AI_REPLY_MAX_TOKENS: int = 120
+    AI_REPLY_TIMEOUT_SECONDS: float = 15.0
+    AI_REPLY_CONTEXT_CHARS: int = 1500
+
+    # LLM feedback on the whole transcript (AIAnalyzer), sent as ai_feedback
+    # messages. Runs once no speech has been recognized for the debounce time,
+    # at a sentence end once the minimum interval has passed, at the latest
+    # after the maximum wait, and on session_end. Sessions can opt in with
+    # "ai_feedback": true in connection_init.
+    LIVE_AI_FEEDBACK_ENABLED: bool = False
+    AI_FEEDBACK_DEBOUNCE_SECONDS: float = 2.0
+    AI_FEEDBACK_MIN_INTERVAL_SECONDS: float = 5.0
+    AI_FEEDBACK_MAX_WAIT_SECONDS: float = 15.0
+
+    # Cache of LLM responses by transcript, model and prompt version: an
+    # in-memory LRU in front of a SQLite file trimmed to LLM_CACHE_MAX_DISK_BYTES
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_MEMORY_ENTRIES: int = 256
+    LLM_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    LLM_CACHE_MAX_DISK_BYTES: int = 50 * 1024 * 1024
+
+    # Session state shared by the server workers: "memory" (one process only),
+    # "sqlite" (the workers of one host, in SESSION_STORE_PATH) or "redis"
+    # (any number of hosts; needs the redis package). Ended sessions' history
+    # is kept SESSION_HISTORY_TTL_SECONDS; live snapshots expire
+    # SESSION_LIVE_TTL_SECONDS after their last update.
+    SESSION_STORE_BACKEND: str = "memory"
+    SESSION_STORE_PATH: str = "./session_state.db"
+    SESSION_STORE_REDIS_URL: str = "redis://localhost:6379/0"
+    SESSION_STORE_KEY_PREFIX: str = "debate:"
+    SESSION_HISTORY_TTL_SECONDS: float = 7 * 24 * 3600
+    SESSION_LIVE_TTL_SECONDS: float = 300.0
+    # Live snapshots are written at most this often, plus on connect, ping and session_end
+    SESSION_LIVE_PUBLISH_INTERVAL_SECONDS: float = 5.0
 
     # Database
     DATABASE_URL: str = "sqlite:///./ai_debate.db"
+    # Async engine connection pool used by the REST endpoints
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Largest number of items accepted by one POST /feedback/bulk request
+    FEEDBACK_BULK_MAX_ITEMS: int = 10000
 
     # CORS - Hardcoded for now to avoid parsing issues
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -27,10 +85,75 @@ class Settings:
     MAX_AUDIO_SIZE_MB: int = 50
     ALLOWED_AUDIO_TYPES: List[str] = ["audio/wav", "audio/mp3", "audio/mpeg"]
     AUDIO_UPLOAD_DIR: str = "./uploads/audio"
+    FFMPEG_PATH: str = r"C:\ffmpeg\bin\ffmpeg.exe"
+    FFPROBE_PATH: str = r"C:\ffmpeg\bin\ffprobe.exe"
+    AUDIO_SAMPLE_RATE: int = 16000
+    DECODER_READ_TIMEOUT_SECONDS: float = 0.2
+
+    # Vendored NLTK corpora (populated by `python prepare_resources.py`)
+    NLTK_DATA_DIR: str = "./nltk_data"
+    # Cold `import app.main` must stay under this (checked by prepare_resources.py --check)
+    IMPORT_TIME_BUDGET_SECONDS: float = 2.0
 
     # WebSocket
     WEBSOCKET_PATH: str = "/ws"
 
+    # Processing pool for blocking decode, recognition and analysis work
+    PROCESSING_WORKERS: int = 4
+    PROCESSING_MAX_PENDING: int = 16
+
+    # Speech recognition backend: "google" (online), "vosk" (offline) or "stub"
+    RECOGNIZER_BACKEND: str = "google"
+    VOSK_MODEL_PATH: str = "./models/vosk-model-small-en-us-0.15"
+    VOSK_USE_BATCH_MODEL: bool = False
+    # Requests from all sessions are batched only by backends that support it:
+    # "stub", and "vosk" with VOSK_USE_BATCH_MODEL (needs a vosk build with
+    # batch support). "google" and plain "vosk" get one pool job per request.
+    RECOGNIZER_BATCH_SIZE: int = 8
+    RECOGNIZER_BATCH_WAIT_MS: int = 50
+
+    # Per-session ingest buffer: chunks waiting for recognition before the
+    # overflow policy ("coalesce", "drop_oldest" or "throttle") applies
+    INGEST_HIGH_WATER_MARK: int = 4
+    INGEST_OVERFLOW_POLICY: str = "coalesce"
+    INGEST_THROTTLE_RETRY_MS: int = 2000
+    # Hard cap on a session's buffered audio; the oldest is discarded beyond it
+    INGEST_MAX_BUFFER_BYTES: int = 4 * 1024 * 1024
+
+    # Voice activity detection: only speech segments are sent to the recognizer.
+    # A frame is speech when it is VAD_ENERGY_MARGIN_DB over the noise floor;
+    # segments keep VAD_PREROLL_MS before and VAD_HANGOVER_MS after the speech.
+    # Unbroken speech is handed on every VAD_MAX_SEGMENT_SECONDS.
+    VAD_ENABLED: bool = True
+    VAD_ENERGY_MARGIN_DB: float = 9.0
+    VAD_HANGOVER_MS: int = 300
+    VAD_PREROLL_MS: int = 200
+    VAD_MAX_SEGMENT_SECONDS: float = 2.0
+
+    # Recognition windows assembled from speech segments (requires VAD_ENABLED):
+    # cut at pauses once at least the minimum length, inside speech (at the
+    # quietest point, with overlap) beyond the maximum. Short utterances wait
+    # up to RECOGNITION_MAX_HOLD_SECONDS of silence for more speech.
+    RECOGNITION_MIN_WINDOW_SECONDS: float = 2.0
+    RECOGNITION_MAX_WINDOW_SECONDS: float = 8.0
+    RECOGNITION_WINDOW_OVERLAP_SECONDS: float = 0.5
+    RECOGNITION_MAX_HOLD_SECONDS: float = 1.5
+
+    # Live session summaries are persisted in batches of up to SUMMARY_WRITE_BATCH_SIZE,
+    # written at most SUMMARY_WRITE_INTERVAL_MS after the first one is queued
+    SUMMARY_WRITE_BATCH_SIZE: int = 50
+    SUMMARY_WRITE_INTERVAL_MS: int = 500
+    SUMMARY_WRITE_MAX_QUEUED: int = 1000
+
+    # Debug capture of received audio (off by default). Sessions are captured
+    # whole when they opt in or, at DEBUG_CAPTURE_SAMPLE_RATE, at random
+    DEBUG_CAPTURE_ENABLED: bool = False
+    DEBUG_CAPTURE_DIR: str = "./debug_capture"
+    DEBUG_CAPTURE_SAMPLE_RATE: float = 0.0
+    DEBUG_CAPTURE_MAX_FILE_BYTES: int = 10 * 1024 * 1024
+    DEBUG_CAPTURE_MAX_TOTAL_BYTES: int = 200 * 1024 * 1024
+    DEBUG_CAPTURE_QUEUE_SIZE: int = 256
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
@@ -0,0 +1,96 @@
+"""
+External resources the backend needs at runtime: NLTK corpora and the
+ffmpeg/ffprobe binaries.
+
+Nothing here runs at import time. `python prepare_resources.py` downloads the
+corpora once into NLTK_DATA_DIR, and the application only checks for them
+(lazily, or from the FastAPI lifespan) so cold starts never touch the
+network or spawn processes.
+"""
+import logging
+import os
+import subprocess
+from typing import Dict, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# NLTK package name -> resource path used by nltk.data.find.
+# NLTK >= 3.8.2 loads punkt_tab and the *_eng tagger; older versions the others.
+NLTK_RESOURCES: Dict[str, str] = {
+    "punkt": "tokenizers/punkt",
+    "punkt_tab": "tokenizers/punkt_tab",
+    "averaged_perceptron_tagger": "taggers/averaged_perceptron_tagger",
+    "averaged_perceptron_tagger_eng": "taggers/averaged_perceptron_tagger_eng",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+}
+
+
+def configure_nltk_data_path() -> None:
+    """Make NLTK look in the project's vendored data directory first"""
+    import nltk
+
+    data_dir = os.path.abspath(settings.NLTK_DATA_DIR)
+    if data_dir not in nltk.data.path:
+        nltk.data.path.insert(0, data_dir)
+
+
+def missing_nltk_resources() -> List[str]:
+    """Names of NLTK packages that cannot be found locally"""
+    import nltk
+
+    configure_nltk_data_path()
+    missing = []
+    for name, resource in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(name)
+    return missing
+
+
+def download_nltk_resources() -> List[str]:
+    """Download every NLTK package into NLTK_DATA_DIR; returns the ones that failed"""
+    import nltk
+
+    os.makedirs(settings.NLTK_DATA_DIR, exist_ok=True)
+    failed = []
+    for name in NLTK_RESOURCES:
+        if not nltk.download(name, download_dir=settings.NLTK_DATA_DIR, quiet=True):
+            failed.append(name)
+    return failed
+
+
+def ffmpeg_version(binary_path: str) -> Optional[str]:
+    """First line of `<binary> -version`, or None if the binary is unusable"""
+    if not os.path.exists(binary_path):
+        return None
+    try:
+        result = subprocess.run([binary_path, "-version"], capture_output=True, text=True, check=True, timeout=10)
+        return result.stdout.splitlines()[0]
+    except (OSError, subprocess.SubprocessError, IndexError):
+        return None
+
+
+def verify_resources() -> Dict[str, object]:
+    """
+    Check that NLTK data and ffmpeg are available, logging what is missing.
+
+    Blocking; call from a worker thread (the lifespan does this at startup).
+    """
+    missing = missing_nltk_resources()
+    if missing:
+        logger.warning(f"Missing NLTK data: {', '.join(missing)}. Run `python prepare_resources.py`.")
+
+    ffmpeg = ffmpeg_version(settings.FFMPEG_PATH)
+    if ffmpeg is None:
+        logger.error(f"FFmpeg not found at {settings.FFMPEG_PATH}. Please install FFmpeg.")
+    else:
+        logger.debug(f"FFmpeg version: {ffmpeg}")
+
+    return {
+        "nltk_missing": missing,
+        "ffmpeg": ffmpeg,
+    }
@@ -1,67 +1,73 @@
 import asyncio
 import base64
+import binascii
+import functools
 import json
 import logging
-import os
-import subprocess
-import uuid
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Optional
 
-import nltk
 import speech_recognition as sr
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from nltk.tokenize import word_tokenize, sent_tokenize
 from pydub import AudioSegment
 from pydub.utils import which
 
-try:
-    from textblob import TextBlob
-except ImportError:
-    TextBlob = None
-    print("Warning: TextBlob not installed. Some features may be limited.")
+from .api.endpoints import analysis, feedback, sessions
+from .core.config import settings
+from .core.resources import verify_resources
+from .models import async_engine, create_tables
+from .services.acoustic_features import extract_features
+from .services.ai_reply import stream_reply
+from .services.analysis_scheduler import DebouncedAnalysis
+from .services.analysis_document import AnalysisDocument
+from .services.audio_decoder import DecoderError, StreamingDecoder
+from .services.audio_protocol import DEFAULT_MIME_TYPE, FrameError, parse_audio_frame
+from .services.debug_capture import debug_capture
+from .services.filler_matcher import FillerMatcher
+from .services.ingest_buffer import AudioChunk, IngestBuffer, OverflowPolicy
+from .services.llm_client import LLMError, llm_client
+from .services.llm_cache import llm_cache
+from .services.processing_pool import SessionWorker, processing_pool
+from .services.recognition import recognition_service
+from .services.recognition_window import WindowAssembler, deduplicate_overlap
+from .services.session_store import session_store
+from .services.speech_metrics import RunningMetrics
+from .services.summary_writer import summary_writer
+from .services.vad import VoiceActivityDetector
 
 # Configure pydub
-AudioSegment.ffmpeg = r"C:\ffmpeg\bin\ffmpeg.exe"
-AudioSegment.ffprobe = r"C:\ffmpeg\bin\ffprobe.exe"
+AudioSegment.ffmpeg = settings.FFMPEG_PATH
+AudioSegment.ffprobe = settings.FFPROBE_PATH
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# Download NLTK data
-try:
-    nltk.download('punkt', quiet=True)
-    nltk.download('averaged_perceptron_tagger', quiet=True)
-except Exception as e:
-    logger.warning(f"Failed to download NLTK data: {e}")
-
-# Set FFmpeg paths
-ffmpeg_path = r"C:\ffmpeg\bin\ffmpeg.exe"
-ffprobe_path = r"C:\ffmpeg\bin\ffprobe.exe"
-
-# Verify FFmpeg
-if not os.path.exists(ffmpeg_path):
-    logger.error("FFmpeg not found at C:\\ffmpeg\\bin\\ffmpeg.exe. Please install FFmpeg.")
-else:
-    try:
-        result = subprocess.run([ffmpeg_path, "-version"], capture_output=True, text=True, check=True)
-        logger.debug(f"FFmpeg version: {result.stdout.splitlines()[0]}")
-    except Exception as e:
-        logger.error(f"FFmpeg check failed: {e}")
+# Set FFmpeg path
+ffmpeg_path = settings.FFMPEG_PATH
 
-if not os.path.exists(ffprobe_path):
-    logger.error("FFprobe not found at C:\\ffmpeg\\bin\\ffprobe.exe. Please install FFmpeg.")
-else:
-    try:
-        result = subprocess.run([ffprobe_path, "-version"], capture_output=True, text=True, check=True)
-        logger.debug(f"FFprobe version: {result.stdout.splitlines()[0]}")
-    except Exception as e:
-        logger.error(f"FFprobe check failed: {e}")
+# Check NLTK data and FFmpeg and prepare the database once the server starts, off the event loop
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(verify_resources)
+    await asyncio.to_thread(create_tables)
+    summary_writer.start()
+    yield
+    await summary_writer.stop()
+    await async_engine.dispose()
+    await recognition_service.close()
+    processing_pool.shutdown()
+    debug_capture.shutdown()
+    # A cache write on a worker thread may hold the lock; don't wait for it on the event loop
+    await asyncio.to_thread(llm_cache.close)
+    await llm_client.close()
+    await session_store.close()
 
 # Initialize FastAPI app
-app = FastAPI(title="AI Debate Analyzer")
+app = FastAPI(title="AI Debate Analyzer", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -72,17 +78,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory storage (replace with SQLite in production)
-session_history: Dict[str, List[Dict]] = {}
+# REST endpoints. The speech upload router (app.api.api_router) is not mounted:
+# it needs librosa, which requirements.txt does not install.
+app.include_router(analysis.router, prefix=f"{settings.API_V1_STR}/analysis", tags=["analysis"])
+app.include_router(sessions.router, prefix=f"{settings.API_V1_STR}/sessions", tags=["sessions"])
+app.include_router(feedback.router, prefix=f"{settings.API_V1_STR}/feedback", tags=["feedback"])
 
-# Connection manager
+# Connection manager. Connections, workers and client_data belong to the
+# process holding the WebSocket; history and a snapshot of each live session
+# go through session_store so every server worker can read them.
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.client_data: Dict[str, Dict[str, Any]] = {}
-        self.recognizer = sr.Recognizer()
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 0.8
+        self.workers: Dict[str, SessionWorker] = {}
 
     async def connect(self, client_id: str, websocket: WebSocket):
         await websocket.accept()
@@ -91,6 +100,26 @@ class ConnectionManager:
             "connected_at": datetime.utcnow(),
             "transcript": "",
             "audio_chunks": [],
+            "running_metrics": RunningMetrics(),
+            "stream_ai_reply": settings.AI_REPLY_STREAMING,
+            "reply_count": 0,
+            "reply_task": None,
+            "ai_feedback": None,
+            "deep_analysis": create_deep_analysis(websocket, client_id) if settings.LIVE_AI_FEEDBACK_ENABLED else None,
+            "vad": VoiceActivityDetector(
+                settings.AUDIO_SAMPLE_RATE,
+                settings.VAD_ENERGY_MARGIN_DB,
+                settings.VAD_HANGOVER_MS,
+                settings.VAD_PREROLL_MS,
+                settings.VAD_MAX_SEGMENT_SECONDS
+            ) if settings.VAD_ENABLED else None,
+            "windows": WindowAssembler(
+                settings.AUDIO_SAMPLE_RATE,
+                settings.RECOGNITION_MIN_WINDOW_SECONDS,
+                settings.RECOGNITION_MAX_WINDOW_SECONDS,
+                settings.RECOGNITION_WINDOW_OVERLAP_SECONDS,
+                settings.RECOGNITION_MAX_HOLD_SECONDS
+            ),
             "metrics": {
                 "word_count": 0,
                 "unique_words": 0,
@@ -112,24 +141,78 @@ class ConnectionManager:
                 "suggestions": []
             }
         }
-        if client_id not in session_history:
-            session_history[client_id] = []
+        self.workers[client_id] = SessionWorker(
+            client_id,
+            functools.partial(process_audio_chunk, websocket, client_id),
+            IngestBuffer(settings.INGEST_HIGH_WATER_MARK, OverflowPolicy(settings.INGEST_OVERFLOW_POLICY), settings.INGEST_MAX_BUFFER_BYTES)
+        )
+        if debug_capture.start_session(client_id):
+            logger.info(f"Session {client_id}: sampled for debug audio capture")
+        await self.publish(client_id, force=True)
         logger.info(f"Client {client_id} connected")
 
-    def disconnect(self, client_id: str):
+    async def publish(self, client_id: str, force: bool = False):
+        """Write the session's live snapshot to the shared store, at most every SESSION_LIVE_PUBLISH_INTERVAL_SECONDS unless forced"""
+        data = self.client_data.get(client_id)
+        if data is None:
+            return
+        now = time.monotonic()
+        if not force and now - data.get("published_at", float("-inf")) < settings.SESSION_LIVE_PUBLISH_INTERVAL_SECONDS:
+            return
+        data["published_at"] = now
+        await session_store.put_live(client_id, {
+            "session_id": client_id,
+            "connected_at": data["connected_at"].isoformat(),
+            "updated_at": datetime.utcnow().isoformat(),
+            "transcript": data["transcript"],
+            "metrics": data["metrics"],
+            "feedback": data["feedback"],
+            "ai_feedback": data["ai_feedback"]
+        })
+
+    def get_decoder(self, client_id: str, input_format: str) -> StreamingDecoder:
+        """Return the session's streaming decoder, starting it on first use"""
+        decoder = self.client_data[client_id].get("decoder")
+        if decoder is None or decoder.closed:
+            decoder = StreamingDecoder(ffmpeg_path, input_format, settings.AUDIO_SAMPLE_RATE)
+            self.client_data[client_id]["decoder"] = decoder
+        return decoder
+
+    async def close_decoder(self, client_id: str) -> bytes:
+        """Stop the session's decoder and return the PCM it still held"""
+        decoder = self.client_data.get(client_id, {}).pop("decoder", None)
+        if decoder is None:
+            return b""
+        return await processing_pool.run(decoder.close)
+
+    async def disconnect(self, client_id: str):
+        worker = self.workers.pop(client_id, None)
+        if worker is not None:
+            await worker.close()
+        reply_task = self.client_data.get(client_id, {}).get("reply_task")
+        if reply_task is not None:
+            reply_task.cancel()
+        deep_analysis = self.client_data.get(client_id, {}).get("deep_analysis")
+        if deep_analysis is not None:
+            deep_analysis.close()
+        await self.close_decoder(client_id)
+        debug_capture.end_session(client_id)
         if client_id in self.active_connections:
             del self.active_connections[client_id]
         if client_id in self.client_data:
             del self.client_data[client_id]
+        await session_store.delete_live(client_id)
         logger.info(f"Client {client_id} disconnected")
 
 manager = ConnectionManager()
 
+# Filler words and phrases counted in live analysis
+filler_matcher = FillerMatcher(['um', 'uh', 'like', 'you know', 'so'])
+
 # AI-based reply system (placeholder)
-async def generate_ai_reply(text: str) -> str:
-    if TextBlob:
-        blob = TextBlob(text)
-        sentiment = blob.sentiment.polarity
+def generate_ai_reply(doc: AnalysisDocument) -> str:
+    sentiment = doc.sentiment
+    if sentiment is not None:
         if sentiment > 0.1:
             return "Great point! Consider adding specific examples to strengthen your argument."
         elif sentiment < -0.1:
@@ -138,38 +221,51 @@ async def generate_ai_reply(text: str) -> str:
             return "Solid argument. Vary sentence structure for better engagement."
     return "AI reply not available due to missing TextBlob."
 
-# Analyze speech
-async def analyze_speech(text: str, audio_duration: float, audio_data: bytes) -> Dict:
-    words = word_tokenize(text.lower())
-    sentences = sent_tokenize(text)
-    
-    # Metrics
-    word_count = len(words)
-    unique_words = len(set(words))
-    vocabulary_richness = unique_words / (word_count or 1)
-    avg_word_length = sum(len(word) for word in words) / (word_count or 1)
-    sentence_count = len(sentences)
+# Analyze speech (blocking NLP work, run on the processing pool)
+# Folds the new chunk into the session's running metrics and scores the whole session so far.
+# With stream_reply the heuristic AI reply is returned as "fallback_reply" instead of
+# being added to the suggestions, since the real reply is streamed afterwards.
+def analyze_speech(text: str, audio_duration: float, pcm: bytes, sample_rate: int, running: RunningMetrics, stream_reply: bool = False, pause_count: Optional[int] = None) -> Dict:
+    doc = AnalysisDocument(text)
+    acoustics = extract_features(pcm, sample_rate)
+    words = doc.lower_tokens
+    sentences = doc.sentences
     
-    # Filler words
-    filler_words = ['um', 'uh', 'like', 'you know', 'so']
-    filler_word_count = sum(1 for word in words if word in filler_words)
+    # Filler words (single pass over the text, phrases included)
+    filler_matches = filler_matcher.find(text)
+    chunk_filler_count, _ = filler_matcher.count(filler_matches)
     
     # Grammar errors
-    grammar_errors = 0
-    if TextBlob:
-        blob = TextBlob(text)
-        grammar_errors = len([word for word, pos in blob.tags if pos == 'NN' and word.endswith('ing')])
-    
-    # Hesitation (placeholder)
-    hesitation_count = max(0, int(audio_duration / 2) - 1)
+    chunk_grammar_errors = len([word for word, pos in doc.pos_tags if pos == 'NN' and word.endswith('ing')])
     
-    # Speaking rate
-    speaking_rate = word_count / (audio_duration / 60) if audio_duration > 0 else 0
+    # Hesitation: pauses in the middle of speech. Behind the VAD the silence is already
+    # cut out of the PCM, so the pauses come from the gaps between speech segments.
+    chunk_hesitation_count = pause_count if pause_count is not None else len(acoustics.interior_pauses)
     
     # Voice analysis
-    clarity_score = min(10, len(audio_data) / 200) if audio_data else 5
+    chunk_clarity_score = acoustics.clarity_score
+    
+    running.update(
+        words,
+        sentence_count=len(sentences),
+        filler_word_count=chunk_filler_count,
+        grammar_errors=chunk_grammar_errors,
+        hesitation_count=chunk_hesitation_count,
+        duration_seconds=audio_duration,
+        clarity_score=chunk_clarity_score,
+    )
+    
+    # Session-wide metrics
+    word_count = running.word_count
+    vocabulary_richness = running.vocabulary_richness
+    sentence_count = running.sentence_count
+    filler_word_count = running.filler_word_count
+    grammar_errors = running.grammar_errors
+    speaking_rate = running.speaking_rate
+    
+    clarity_score = running.clarity_score
     confidence_score = 8 if 120 < speaking_rate < 180 else 6
-    fluency_score = 8 if filler_word_count / (word_count or 1) < 0.1 else 6
+    fluency_score = 8 if running.filler_word_rate < 0.1 else 6
     overall_score = (clarity_score + confidence_score + fluency_score + (1 - grammar_errors / (sentence_count or 1)) * 10) / 4
     
     # Feedback
@@ -202,20 +298,13 @@ async def analyze_speech(text: str, audio_duration: float, audio_data: bytes) ->
         suggestions.append("Aim for 120-180 words per minute.")
     
     # AI reply
-    ai_reply = await generate_ai_reply(text)
-    suggestions.append(ai_reply)
+    ai_reply = generate_ai_reply(doc)
+    if not stream_reply:
+        suggestions.append(ai_reply)
     
     return {
         "metrics": {
-            "word_count": word_count,
-            "unique_words": unique_words,
-            "vocabulary_richness": vocabulary_richness,
-            "avg_word_length": avg_word_length,
-            "sentence_count": sentence_count,
-            "filler_word_count": filler_word_count,
-            "grammar_errors": grammar_errors,
-            "hesitation_count": hesitation_count,
-            "speaking_rate": speaking_rate,
+            **running.snapshot(),
             "overall_score": overall_score,
             "clarity_score": clarity_score,
             "confidence_score": confidence_score,
@@ -225,149 +314,320 @@ async def analyze_speech(text: str, audio_duration: float, audio_data: bytes) ->
             "strengths": strengths,
             "areas_for_improvement": areas_for_improvement,
             "suggestions": suggestions
-        }
+        },
+        "highlights": [match.to_dict() for match in filler_matches],
+        "acoustics": acoustics.to_dict(),
+        "fallback_reply": ai_reply if stream_reply else None
     }
 
+# Stream an AI reply to the client as ai_reply_delta messages, then ai_reply_done.
+# Falls back to the heuristic reply if the LLM fails before producing any text.
+async def stream_ai_reply(websocket: WebSocket, session_id: str, reply_id: int, transcript: str, text: str, fallback: str):
+    parts = []
+    used_fallback = False
+    try:
+        try:
+            async for delta in stream_reply(transcript, text):
+                parts.append(delta)
+                await websocket.send_json({
+                    "type": "ai_reply_delta",
+                    "reply_id": reply_id,
+                    "delta": delta,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+        except LLMError as e:
+            logger.warning(f"Session {session_id}: AI reply {reply_id} failed: {e}")
+            if not parts:
+                used_fallback = True
+                parts.append(fallback)
+                await websocket.send_json({
+                    "type": "ai_reply_delta",
+                    "reply_id": reply_id,
+                    "delta": fallback,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+        
+        reply = "".join(parts)
+        if session_id in manager.client_data:
+            manager.client_data[session_id]["feedback"]["suggestions"].append(reply)
+        await websocket.send_json({
+            "type": "ai_reply_done",
+            "reply_id": reply_id,
+            "ai_reply": reply,
+            "fallback": used_fallback,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Session {session_id}: error streaming AI reply {reply_id}: {e}")
+
+# Start streaming a reply to the latest speech; a newer reply replaces one still in progress
+def start_ai_reply(websocket: WebSocket, session_id: str, reply_id: int, text: str, fallback: str):
+    session = manager.client_data[session_id]
+    previous = session["reply_task"]
+    if previous is not None and not previous.done():
+        previous.cancel()
+    session["reply_task"] = asyncio.create_task(
+        stream_ai_reply(websocket, session_id, reply_id, session["transcript"], text, fallback)
+    )
+
+# Wait for the reply still streaming, if any, so it is part of the session summary
+async def finish_ai_reply(session_id: str):
+    reply_task = manager.client_data[session_id]["reply_task"]
+    if reply_task is not None:
+        try:
+            await reply_task
+        except asyncio.CancelledError:
+            pass
+
+# LLM feedback on the whole transcript, run by the session's DebouncedAnalysis
+# rather than per chunk. Each run gets its own analyzer so a cancelled run
+# leaves nothing behind.
+async def run_deep_analysis(session_id: str, transcript: str) -> Dict:
+    # Imported on first use; AIAnalyzer pulls in the NLTK corpora
+    from .services.ai_analyzer import AIAnalyzer
+    duration = manager.client_data[session_id]["running_metrics"].speaking_time_seconds if session_id in manager.client_data else None
+    return await AIAnalyzer().analyze_speech(transcript, duration)
+
+def create_deep_analysis(websocket: WebSocket, session_id: str) -> DebouncedAnalysis:
+    async def send_feedback(result: Dict, final: bool, stale: bool):
+        if session_id not in manager.client_data or "error" in result:
+            return
+        manager.client_data[session_id]["ai_feedback"] = result
+        await websocket.send_json({
+            "type": "ai_feedback",
+            "final": final,
+            "stale": stale,
+            "feedback": result["feedback"],
+            "metrics": result["metrics"],
+            "timestamp": datetime.utcnow().isoformat()
+        })
+        await manager.publish(session_id)
+    
+    return DebouncedAnalysis(
+        functools.partial(run_deep_analysis, session_id),
+        send_feedback,
+        settings.AI_FEEDBACK_DEBOUNCE_SECONDS,
+        settings.AI_FEEDBACK_MIN_INTERVAL_SECONDS,
+        settings.AI_FEEDBACK_MAX_WAIT_SECONDS
+    )
+
+# Recognize a span of speech and send the analysis back to the client
+async def recognize_speech(websocket: WebSocket, session_id: str, pcm: bytes, duration_seconds: float, overlap_seconds: float = 0.0, pause_count: Optional[int] = None):
+    try:
+        text = await recognition_service.recognize(pcm, settings.AUDIO_SAMPLE_RATE)
+        logger.debug(f"Transcribed text: {text}")
+        
+        if overlap_seconds:
+            # The window starts with audio the previous one already covered
+            text = deduplicate_overlap(manager.client_data[session_id]["transcript"], text)
+            duration_seconds -= overlap_seconds
+            if not text:
+                return
+        
+        manager.client_data[session_id]["transcript"] += " " + text
+        streaming = manager.client_data[session_id]["stream_ai_reply"]
+        analysis = await processing_pool.run(
+            analyze_speech, text, duration_seconds, pcm, settings.AUDIO_SAMPLE_RATE, manager.client_data[session_id]["running_metrics"], streaming, pause_count
+        )
+        
+        manager.client_data[session_id]["metrics"] = analysis["metrics"]
+        manager.client_data[session_id]["feedback"] = analysis["feedback"]
+        
+        # Metrics go out first; a streamed reply follows in ai_reply_delta messages
+        update = {
+            "type": "analysis_update",
+            "timestamp": datetime.utcnow().isoformat(),
+            "transcript": text,
+            "full_transcript": manager.client_data[session_id]["transcript"],
+            "metrics": analysis["metrics"],
+            "feedback": analysis["feedback"],
+            "ai_reply": None if streaming else analysis["feedback"]["suggestions"][-1],
+            "highlights": analysis["highlights"],
+            "acoustics": analysis["acoustics"],
+            "queue_depth": manager.workers[session_id].depth
+        }
+        if streaming:
+            # Tells the client which ai_reply_delta messages answer this update
+            manager.client_data[session_id]["reply_count"] += 1
+            update["reply_id"] = manager.client_data[session_id]["reply_count"]
+        await websocket.send_json(update)
+        if streaming:
+            start_ai_reply(websocket, session_id, update["reply_id"], text, analysis["fallback_reply"])
+        # Cheap metrics go out with every update; LLM feedback waits for a pause in the speech
+        deep_analysis = manager.client_data[session_id]["deep_analysis"]
+        if deep_analysis is not None:
+            deep_analysis.notify(manager.client_data[session_id]["transcript"])
+        await manager.publish(session_id)
+    except sr.UnknownValueError:
+        await websocket.send_json({
+            "type": "warning",
+            "message": "Could not understand audio.",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    except sr.RequestError as e:
+        await websocket.send_json({
+            "type": "error",
+            "message": f"Speech recognition error: {e}",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+# Recognize the speech still buffered when the session ends
+async def flush_speech(websocket: WebSocket, session_id: str):
+    # ffmpeg still holds the end of the stream; closing the decoder flushes it
+    pcm = await manager.close_decoder(session_id)
+    if pcm:
+        await recognize_pcm(websocket, session_id, pcm, len(pcm) / 2 / settings.AUDIO_SAMPLE_RATE)
+    vad = manager.client_data[session_id].get("vad")
+    if vad is None:
+        return
+    assembler = manager.client_data[session_id]["windows"]
+    windows = [window for segment in vad.flush() for window in assembler.add(segment)]
+    windows += assembler.flush()
+    for window in windows:
+        await recognize_speech(websocket, session_id, window.pcm, window.duration_seconds, window.overlap_seconds, window.pause_count)
+
+# Recognize decoded PCM, through the VAD and recognition windows when enabled
+async def recognize_pcm(websocket: WebSocket, session_id: str, pcm: bytes, duration_seconds: float):
+    vad = manager.client_data[session_id].get("vad")
+    if vad is None:
+        await recognize_speech(websocket, session_id, pcm, duration_seconds)
+        return
+    
+    # Speech segments are joined into pause-aligned windows; silence never reaches the recognizer
+    assembler = manager.client_data[session_id]["windows"]
+    windows = [window for segment in vad.feed(pcm) for window in assembler.add(segment)]
+    windows += assembler.poll(vad.position_seconds)
+    for window in windows:
+        logger.debug(f"Session {session_id}: recognizing {window.duration_seconds:.2f}s from {window.start_seconds:.2f}s")
+        await recognize_speech(websocket, session_id, window.pcm, window.duration_seconds, window.overlap_seconds, window.pause_count)
+
+# Process a single audio chunk and send the analysis back to the client
+async def process_audio_chunk(websocket: WebSocket, session_id: str, chunk: AudioChunk):
+    audio_data = chunk.payload
+    audio_duration = chunk.duration_seconds
+    try:
+        if not audio_data:
+            raise ValueError("Empty audio data")
+        
+        extension = StreamingDecoder.format_for_mime_type(chunk.mime_type)
+        
+        # Decode to PCM with the session's long-lived ffmpeg process
+        decoder = manager.get_decoder(session_id, extension)
+        pcm = await processing_pool.run(decoder.feed, audio_data, timeout=settings.DECODER_READ_TIMEOUT_SECONDS)
+        logger.debug(f"Decoded {len(audio_data)} bytes into {len(pcm)} bytes of PCM")
+        
+        vad = manager.client_data[session_id].get("vad")
+        if not chunk.recognize:
+            # Dropped by the ingest buffer's overflow policy; don't stitch speech across the gap
+            if vad is not None:
+                vad.feed(pcm)
+                vad.drop_segment()
+            logger.debug(f"Session {session_id}: skipped recognition of {audio_duration:.1f}s of dropped audio")
+            return
+        
+        if not pcm:
+            # The decoder is still buffering; this audio comes out with the next chunk
+            return
+        
+        await recognize_pcm(websocket, session_id, pcm, audio_duration)
+    except DecoderError as e:
+        logger.error(f"Audio decoding failed: {e}")
+        await manager.close_decoder(session_id)
+        await websocket.send_json({
+            "type": "error",
+            "message": f"Error decoding audio: {e}",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"Error in speech recognition: {e}")
+        await websocket.send_json({
+            "type": "error",
+            "message": f"Error processing speech: {e}",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+# Queue a received chunk for the session worker, asking the client to slow down if needed
+async def submit_audio_chunk(websocket: WebSocket, session_id: str, chunk: AudioChunk):
+    debug_capture.capture(session_id, chunk.payload, StreamingDecoder.format_for_mime_type(chunk.mime_type))
+    worker = manager.workers[session_id]
+    if worker.submit(chunk):
+        await websocket.send_json({
+            "type": "throttle",
+            "message": "Analysis is falling behind, please send audio less often.",
+            "queue_depth": worker.depth,
+            "high_water_mark": worker.buffer.high_water_mark,
+            "retry_after_ms": settings.INGEST_THROTTLE_RETRY_MS,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
 # WebSocket endpoint
 @app.websocket("/ws/debate/{session_id}")
 async def debate_websocket(websocket: WebSocket, session_id: str):
     await manager.connect(session_id, websocket)
     logger.info(f"New debate session started: {session_id}")
     
-    temp_dir = r"C:\Users\mukun\temp"
-    debug_dir = r"C:\Users\mukun\temp\debug"
-    for directory in [temp_dir, debug_dir]:
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-            logger.debug(f"Created directory: {directory}")
-    
     try:
         while True:
-            data = await websocket.receive_text()
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+            
+            # Binary frames carry raw audio (see app/services/audio_protocol.py)
+            if received.get("bytes") is not None:
+                try:
+                    frame = parse_audio_frame(received["bytes"])
+                except FrameError as e:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"Invalid audio frame: {e}",
+                        "timestamp": datetime.utcnow().isoformat()
+                    })
+                    continue
+                
+                last_sequence = manager.client_data[session_id].get("last_sequence")
+                if last_sequence is not None and frame.sequence != last_sequence + 1:
+                    logger.warning(f"Session {session_id}: audio frame {frame.sequence} received after {last_sequence}")
+                manager.client_data[session_id]["last_sequence"] = frame.sequence
+                logger.debug(f"Received audio frame {frame.sequence}, {len(frame.payload)} bytes, MIME type: {frame.mime_type}")
+                
+                chunk = AudioChunk(frame.payload, frame.mime_type, frame.duration_seconds, frame.sequence)
+                await submit_audio_chunk(websocket, session_id, chunk)
+                continue
+            
+            data = received.get("text")
             try:
                 message = json.loads(data)
                 message_type = message.get("type")
                 
+                # Legacy base64 JSON audio, kept for older clients
                 if message_type == "audio_chunk":
+                    base64_string = message.get("data", "")
+                    mime_type = message.get("mime_type", DEFAULT_MIME_TYPE)
+                    logger.debug(f"Received audio chunk, base64 length: {len(base64_string)}, MIME type: {mime_type}")
+                    
                     try:
-                        base64_string = message["data"]
-                        mime_type = message.get("mime_type", "audio/webm;codecs=opus")
-                        logger.debug(f"Received audio chunk, base64 length: {len(base64_string)}, MIME type: {mime_type}")
-                        
-                        # Save base64 for debugging
-                        debug_base64_path = os.path.join(debug_dir, f"base64_{uuid.uuid4()}.txt")
-                        with open(debug_base64_path, "w") as debug_file:
-                            debug_file.write(base64_string)
-                        
-                        # Decode base64
                         audio_data = base64.b64decode(base64_string)
-                        if not audio_data:
-                            raise ValueError("Empty audio data")
-                        
-                        audio_duration = message.get("duration_seconds", 0)
-                        extension = "webm" if "webm" in mime_type.lower() else "ogg"
-                        temp_audio_path = os.path.join(temp_dir, f"audio_{uuid.uuid4()}.{extension}")
-                        
-                        # Save audio
-                        with open(temp_audio_path, "wb") as temp_audio_file:
-                            temp_audio_file.write(audio_data)
-                            temp_audio_file.flush()
-                            os.fsync(temp_audio_file.fileno())
-                        file_size = os.path.getsize(temp_audio_path)
-                        logger.debug(f"Saved audio: {temp_audio_path}, size: {file_size} bytes")
-                        
-                        if file_size < 1000:
-                            raise ValueError(f"Audio file too small: {file_size} bytes")
-                        
-                        # Save debug copy
-                        debug_audio_path = os.path.join(debug_dir, f"debug_audio_{uuid.uuid4()}.{extension}")
-                        with open(debug_audio_path, "wb") as debug_audio_file:
-                            debug_audio_file.write(audio_data)
-                        
-                        # Validate with ffprobe
-                        try:
-                            result = subprocess.run(
-                                [ffprobe_path, "-v", "error", "-show_streams", "-print_format", "json", temp_audio_path],
-                                capture_output=True,
-                                text=True,
-                                check=True
-                            )
-                            ffprobe_output = json.loads(result.stdout)
-                            if not ffprobe_output.get("streams"):
-                                raise ValueError("No audio streams found")
-                            logger.debug(f"FFprobe validation: {ffprobe_output}")
-                        except Exception as e:
-                            logger.error(f"FFprobe validation failed: {e}")
-                            raise Exception(f"Invalid audio file: {e}")
-                        
-                        # Convert to WAV
-                        temp_wav_path = os.path.join(temp_dir, f"audio_{uuid.uuid4()}.wav")
-                        try:
-                            result = subprocess.run(
-                                [ffmpeg_path, "-f", extension, "-i", temp_audio_path, "-acodec", "pcm_s16le", "-ar", "16000", temp_wav_path],
-                                capture_output=True,
-                                text=True,
-                                check=True
-                            )
-                            logger.debug(f"FFmpeg conversion: stdout={result.stdout}, stderr={result.stderr}")
-                        except subprocess.CalledProcessError as e:
-                            logger.error(f"FFmpeg conversion failed: stdout={e.stdout}, stderr={e.stderr}")
-                            raise Exception(f"FFmpeg conversion failed: {e.stderr}")
-                        
-                        wav_size = os.path.getsize(temp_wav_path)
-                        logger.debug(f"Exported WAV: {temp_wav_path}, size: {wav_size} bytes")
-                        
-                        if wav_size == 0:
-                            raise ValueError("WAV file is empty")
-                        
-                        # Speech recognition
-                        with sr.AudioFile(temp_wav_path) as source:
-                            audio = manager.recognizer.record(source)
-                            try:
-                                text = manager.recognizer.recognize_google(audio)
-                                logger.debug(f"Transcribed text: {text}")
-                                
-                                manager.client_data[session_id]["transcript"] += " " + text
-                                analysis = await analyze_speech(text, audio_duration, audio_data)
-                                
-                                manager.client_data[session_id]["metrics"] = analysis["metrics"]
-                                manager.client_data[session_id]["feedback"] = analysis["feedback"]
-                                
-                                await websocket.send_json({
-                                    "type": "analysis_update",
-                                    "timestamp": datetime.utcnow().isoformat(),
-                                    "transcript": text,
-                                    "full_transcript": manager.client_data[session_id]["transcript"],
-                                    "metrics": analysis["metrics"],
-                                    "feedback": analysis["feedback"],
-                                    "ai_reply": analysis["feedback"]["suggestions"][-1]
-                                })
-                            except sr.UnknownValueError:
-                                await websocket.send_json({
-                                    "type": "warning",
-                                    "message": "Could not understand audio.",
-                                    "timestamp": datetime.utcnow().isoformat()
-                                })
-                            except sr.RequestError as e:
-                                await websocket.send_json({
-                                    "type": "error",
-                                    "message": f"Speech recognition error: {e}",
-                                    "timestamp": datetime.utcnow().isoformat()
-                                })
-                    except Exception as e:
-                        logger.error(f"Error in speech recognition: {e}")
+                    except (binascii.Error, ValueError) as e:
                         await websocket.send_json({
                             "type": "error",
                             "message": f"Error processing speech: {e}",
                             "timestamp": datetime.utcnow().isoformat()
                         })
-                    finally:
-                        if os.path.exists(temp_audio_path):
-                            os.unlink(temp_audio_path)
-                        if 'temp_wav_path' in locals() and os.path.exists(temp_wav_path):
-                            os.unlink(temp_wav_path)
+                        continue
+                    
+                    chunk = AudioChunk(audio_data, mime_type, message.get("duration_seconds", 0))
+                    await submit_audio_chunk(websocket, session_id, chunk)
                 
                 elif message_type == "session_end":
+                    # Finish queued audio so the summary covers the whole session
+                    await manager.workers[session_id].drain()
+                    await flush_speech(websocket, session_id)
+                    await finish_ai_reply(session_id)
+                    deep_analysis = manager.client_data[session_id]["deep_analysis"]
+                    if deep_analysis is not None:
+                        await deep_analysis.flush()
                     session_duration = message.get("session_duration_seconds", 0) / 60
                     session_data = {
                         "session_id": session_id,
@@ -382,9 +642,19 @@ async def debate_websocket(websocket: WebSocket, session_id: str):
                         "confidence_score": manager.client_data[session_id]["metrics"]["confidence_score"],
                         "fluency_score": manager.client_data[session_id]["metrics"]["fluency_score"],
                         "key_takeaways": manager.client_data[session_id]["feedback"]["suggestions"],
-                        "full_transcript": manager.client_data[session_id]["transcript"]
+                        "full_transcript": manager.client_data[session_id]["transcript"],
+                        "ai_feedback": manager.client_data[session_id]["ai_feedback"]
                     }
-                    session_history[session_id].append(session_data)
+                    await session_store.append_history(session_id, session_data)
+                    await manager.publish(session_id, force=True)
+                    # Persisted in the background, batched with other sessions
+                    summary_writer.submit(
+                        session_id,
+                        session_data,
+                        manager.client_data[session_id]["metrics"],
+                        manager.client_data[session_id]["feedback"],
+                        user_id=message.get("user_id")
+                    )
                     await websocket.send_json({
                         "type": "session_summary",
                         "message": "Session ended",
@@ -393,6 +663,17 @@ async def debate_websocket(websocket: WebSocket, session_id: str):
                     })
                 
                 elif message_type == "connection_init":
+                    if message.get("debug_capture") and debug_capture.start_session(session_id, opt_in=True):
+                        logger.info(f"Session {session_id}: capturing audio for debugging")
+                    if "stream_ai_reply" in message:
+                        manager.client_data[session_id]["stream_ai_reply"] = bool(message["stream_ai_reply"])
+                    if "ai_feedback" in message:
+                        deep_analysis = manager.client_data[session_id]["deep_analysis"]
+                        if message["ai_feedback"] and deep_analysis is None:
+                            manager.client_data[session_id]["deep_analysis"] = create_deep_analysis(websocket, session_id)
+                        elif not message["ai_feedback"] and deep_analysis is not None:
+                            deep_analysis.close()
+                            manager.client_data[session_id]["deep_analysis"] = None
                     await websocket.send_json({
                         "type": "connection_ack",
                         "message": "Connection established",
@@ -400,6 +681,8 @@ async def debate_websocket(websocket: WebSocket, session_id: str):
                     })
                 
                 elif message_type == "ping":
+                    # Keeps the live snapshot current and from expiring during long pauses
+                    await manager.publish(session_id, force=True)
                     await websocket.send_json({
                         "type": "pong",
                         "timestamp": datetime.utcnow().isoformat()
@@ -412,15 +695,23 @@ async def debate_websocket(websocket: WebSocket, session_id: str):
                     "timestamp": datetime.utcnow().isoformat()
                 })
     except WebSocketDisconnect:
-        manager.disconnect(session_id)
+        await manager.disconnect(session_id)
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        manager.disconnect(session_id)
+        await manager.disconnect(session_id)
 
-# Session history endpoint
+# Session history endpoint (served by any worker)
 @app.get("/history/{session_id}")
 async def get_session_history(session_id: str):
-    return session_history.get(session_id, [])
+    return await session_store.get_history(session_id)
+
+# Snapshot of a session still connected, possibly to another worker
+@app.get("/live/{session_id}")
+async def get_live_session(session_id: str):
+    state = await session_store.get_live(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not connected")
+    return state
 
 # Root endpoint
 @app.get("/")
@@ -430,7 +721,27 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "debug_capture": debug_capture.stats(),
+        "summary_writer": summary_writer.stats(),
+        "llm_cache": llm_cache.stats(),
+        "llm_client": llm_client.stats(),
+        "session_store": session_store.stats(),
+        "processing": {
+            **processing_pool.stats(),
+            "recognition": recognition_service.stats(),
+            "sessions": {
+                session_id: {
+                    **worker.stats(),
+                    "vad": manager.client_data[session_id]["vad"].stats() if manager.client_data[session_id].get("vad") else None,
+                    "windows": manager.client_data[session_id]["windows"].stats(),
+                    "ai_feedback": manager.client_data[session_id]["deep_analysis"].stats() if manager.client_data[session_id].get("deep_analysis") else None
+                }
+                for session_id, worker in manager.workers.items()
+            }
+        }
+    }
 
 if __name__ == "__main__":
     import uvicorn
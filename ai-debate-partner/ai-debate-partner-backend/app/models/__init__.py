@@ -1,17 +1,35 @@
-from .database import Base, engine, get_db
-from .models import Session, Feedback
+from sqlalchemy import inspect, text
+
+from .database import Base, engine, async_engine, get_db, get_async_db
+from .models import Session, Feedback, AnalyticsRollup
 from .schemas import AnalysisType
 
 # This will create the database tables
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add the (nullable) columns
+    # and indexes introduced since
+    existing = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            present = {column["name"] for column in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 __all__ = [
     'Base',
     'engine',
+    'async_engine',
     'get_db',
+    'get_async_db',
     'Session',
     'Feedback',
+    'AnalyticsRollup',
     'AnalysisType',
     'create_tables'
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, ForeignKey, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
@@ -20,18 +20,48 @@ class Session(Base):
     description = Column(Text, nullable=True)
     duration_seconds = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Set for sessions recorded over the live WebSocket: its session id and end-of-session summary
+    live_session_id = Column(String, index=True, nullable=True)
+    summary = Column(JSON, nullable=True)
     
     feedbacks = relationship("Feedback", back_populates="session")
+    
+    # Newest-first listings (all sessions, or one user's) read these in index
+    # order; id breaks created_at ties for keyset pagination
+    __table_args__ = (
+        Index("ix_sessions_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_sessions_created_at_id", "created_at", "id"),
+    )
 
 class Feedback(Base):
     __tablename__ = "feedbacks"
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String, ForeignKey("sessions.id"))
+    session_id = Column(String, ForeignKey("sessions.id"), index=True)
     analysis_type = Column(Enum(AnalysisType))
     score = Column(Float)
     feedback = Column(Text)
-    suggestions = Column(Text)
+    # JSON list of strings, serialized by the column type on write and read back as a list
+    suggestions = Column(JSON, nullable=False, default=list)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     session = relationship("Session", back_populates="feedbacks")
+
+class AnalyticsRollup(Base):
+    """
+    Per user, category and day sums of feedback scores, maintained as
+    feedback is inserted (see app/services/analytics_rollup.py).
+
+    x is the session's time of day as a fraction of a day, so rows for
+    different days combine exactly once shifted by their day offset.
+    """
+    __tablename__ = "analytics_rollups"
+    
+    user_id = Column(String, primary_key=True)
+    analysis_type = Column(Enum(AnalysisType), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    sum = Column(Float, nullable=False, default=0.0)
+    sum_x = Column(Float, nullable=False, default=0.0)
+    sum_xx = Column(Float, nullable=False, default=0.0)
+    sum_xy = Column(Float, nullable=False, default=0.0)
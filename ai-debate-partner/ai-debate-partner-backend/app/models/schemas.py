@@ -27,6 +27,16 @@ class Feedback(FeedbackBase):
     class Config:
         from_attributes = True
 
+class BulkFeedbackError(BaseModel):
+    index: int
+    error: str
+
+class BulkFeedbackResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkFeedbackError] = []
+
 class SessionBase(BaseModel):
     user_id: str
     title: str
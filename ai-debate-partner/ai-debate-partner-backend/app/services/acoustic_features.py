@@ -0,0 +1,191 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+# Analysis frames: 40 ms windows every 10 ms, long enough to hold two periods of a 50 Hz voice
+FRAME_MS = 40
+HOP_MS = 10
+
+# Pitch search range covering adult and child speaking voices
+MIN_PITCH_HZ = 60.0
+MAX_PITCH_HZ = 400.0
+# Normalized autocorrelation peak above which a frame counts as periodic
+VOICING_THRESHOLD = 0.45
+
+# Frames quieter than this (dBFS), or within SILENCE_MARGIN_DB of the noise floor, are silence
+SILENCE_FLOOR_DB = -50.0
+SILENCE_MARGIN_DB = 6.0
+# Silences shorter than this are articulation gaps rather than pauses
+MIN_PAUSE_SECONDS = 0.25
+
+_EPSILON = 1e-10
+
+
+class AcousticFeatures(NamedTuple):
+    duration_seconds: float
+    rms_db: float                            # mean level of non-silent frames, dBFS
+    snr_db: float                            # speech level over the estimated noise floor
+    hnr_db: float                            # mean harmonics-to-noise ratio of voiced frames
+    pitch_hz: np.ndarray                     # per-frame F0, 0 where unvoiced
+    voiced_ratio: float                      # fraction of frames that are voiced
+    pauses: List[Tuple[float, float]]        # (start, end) seconds of each pause
+    clarity_score: float                     # 0-10
+    volume_score: float                      # 0-10
+    pitch_variation_score: float             # 0-10
+
+    @property
+    def pitch_mean_hz(self) -> float:
+        voiced = self.pitch_hz[self.pitch_hz > 0]
+        return float(voiced.mean()) if voiced.size else 0.0
+
+    @property
+    def interior_pauses(self) -> List[Tuple[float, float]]:
+        """Pauses with speech on both sides, i.e. not leading or trailing silence"""
+        return [(start, end) for start, end in self.pauses if start > 0 and end < self.duration_seconds]
+
+    def to_dict(self) -> Dict:
+        return {
+            "duration_seconds": round(self.duration_seconds, 3),
+            "rms_db": round(self.rms_db, 1),
+            "snr_db": round(self.snr_db, 1),
+            "hnr_db": round(self.hnr_db, 1),
+            "pitch_mean_hz": round(self.pitch_mean_hz, 1),
+            "voiced_ratio": round(self.voiced_ratio, 3),
+            "pause_count": len(self.interior_pauses),
+            "clarity_score": round(self.clarity_score, 2),
+            "volume_score": round(self.volume_score, 2),
+            "pitch_variation_score": round(self.pitch_variation_score, 2),
+        }
+
+
+def pcm_to_float(pcm: bytes) -> np.ndarray:
+    """Little-endian 16-bit mono PCM as float32 samples in [-1, 1)"""
+    usable = len(pcm) - len(pcm) % 2
+    return np.frombuffer(pcm[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+def frame_signal(samples: np.ndarray, frame_length: int, hop_length: int) -> np.ndarray:
+    """(n_frames, frame_length) strided view of the signal; the last partial frame is dropped"""
+    if samples.size < frame_length:
+        return np.empty((0, frame_length), dtype=samples.dtype)
+    return np.lib.stride_tricks.sliding_window_view(samples, frame_length)[::hop_length]
+
+
+def _pitch_track(frames: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-frame F0 and normalized autocorrelation peak.
+
+    Autocorrelation for all frames is computed at once through one batched
+    FFT (Wiener-Khinchin), then the strongest lag in the pitch range is
+    picked per frame with a single argmax.
+    """
+    frame_length = frames.shape[1]
+    min_lag = max(1, int(sample_rate / MAX_PITCH_HZ))
+    # Lags beyond half a frame overlap too few samples to be trusted
+    max_lag = min(frame_length // 2, int(sample_rate / MIN_PITCH_HZ))
+    if frames.shape[0] == 0 or max_lag <= min_lag:
+        empty = np.zeros(frames.shape[0], dtype=np.float32)
+        return empty, empty
+
+    window = np.hanning(frame_length).astype(np.float32)
+    centered = frames - frames.mean(axis=1, keepdims=True)
+    n_fft = 1 << int(np.ceil(np.log2(2 * frame_length)))
+    spectrum = np.fft.rfft(centered * window, n=n_fft, axis=1)
+    autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft, axis=1)
+    # Dividing by the window's own autocorrelation undoes its taper (Boersma 1993)
+    window_spectrum = np.fft.rfft(window, n=n_fft)
+    window_autocorr = np.fft.irfft(np.abs(window_spectrum) ** 2, n=n_fft)
+
+    energy = autocorr[:, :1] + _EPSILON
+    lags = slice(min_lag, max_lag + 1)
+    candidates = (autocorr[:, lags] / energy) * (window_autocorr[0] / window_autocorr[lags])
+    # Multiples of the period correlate almost as well as the period itself, so
+    # take the shortest lag that is a local peak within 10% of the best one
+    peak = np.max(candidates, axis=1, keepdims=True)
+    local_peak = np.zeros_like(candidates, dtype=bool)
+    local_peak[:, 1:-1] = (candidates[:, 1:-1] >= candidates[:, :-2]) & (candidates[:, 1:-1] >= candidates[:, 2:])
+    best = np.argmax(local_peak & (candidates >= 0.9 * peak), axis=1)
+    strength = candidates[np.arange(candidates.shape[0]), best]
+    pitch = sample_rate / (best + min_lag)
+    return pitch.astype(np.float32), strength.astype(np.float32)
+
+
+def find_runs(mask: np.ndarray) -> np.ndarray:
+    """(start, end) frame indices of each run of True values, end exclusive"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)), axis=1)
+
+
+def _scale(value: float, low: float, high: float) -> float:
+    """Linear map of [low, high] onto the 0-10 score range, clipped"""
+    return float(np.clip((value - low) / (high - low) * 10, 0, 10))
+
+
+def extract_features(pcm: bytes, sample_rate: int) -> AcousticFeatures:
+    """
+    Frame-wise acoustic features of decoded mono 16-bit PCM.
+
+    Everything is computed with whole-array NumPy operations over the
+    frame matrix; there are no per-sample or per-frame Python loops.
+    """
+    samples = pcm_to_float(pcm)
+    duration = samples.size / sample_rate
+    frame_length = int(sample_rate * FRAME_MS / 1000)
+    hop_length = int(sample_rate * HOP_MS / 1000)
+    frames = frame_signal(samples, frame_length, hop_length)
+
+    if frames.shape[0] == 0:
+        return AcousticFeatures(
+            duration_seconds=duration, rms_db=SILENCE_FLOOR_DB, snr_db=0.0, hnr_db=0.0,
+            pitch_hz=np.zeros(0, dtype=np.float32), voiced_ratio=0.0,
+            pauses=[(0.0, duration)] if duration else [],
+            clarity_score=0.0, volume_score=0.0, pitch_variation_score=0.0,
+        )
+
+    # Energy per frame and the noise floor / speech level estimated from its distribution
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    rms_db = 20 * np.log10(rms + _EPSILON)
+    noise_db, speech_db = np.percentile(rms_db, [10, 90])
+    snr_db = float(max(0.0, speech_db - noise_db))
+
+    silence_threshold = max(SILENCE_FLOOR_DB, noise_db + SILENCE_MARGIN_DB) if snr_db > SILENCE_MARGIN_DB else SILENCE_FLOOR_DB
+    active = rms_db > silence_threshold
+
+    pitch, strength = _pitch_track(frames, sample_rate)
+    voiced = active & (strength > VOICING_THRESHOLD)
+    pitch = np.where(voiced, pitch, 0).astype(np.float32)
+
+    # Pause segmentation: runs of silent frames long enough to be a pause
+    seconds_per_hop = hop_length / sample_rate
+    min_pause_frames = int(np.ceil(MIN_PAUSE_SECONDS / seconds_per_hop))
+    silent_runs = find_runs(~active)
+    silent_runs = silent_runs[silent_runs[:, 1] - silent_runs[:, 0] >= min_pause_frames]
+    bounds = np.minimum(silent_runs * seconds_per_hop, duration)
+    bounds[silent_runs[:, 1] == len(active), 1] = duration
+    pauses = [(float(start), float(end)) for start, end in bounds]
+
+    level_db = float(rms_db[active].mean()) if active.any() else SILENCE_FLOOR_DB
+    voiced_pitch = pitch[voiced]
+    # Pitch spread in semitones, so it does not depend on the speaker's register
+    semitone_spread = float(np.std(12 * np.log2(voiced_pitch / np.median(voiced_pitch)))) if voiced_pitch.size > 1 else 0.0
+    voiced_ratio = float(voiced.mean())
+    # Harmonicity of voiced frames: breathy or noisy voice has a weak periodic peak
+    voiced_strength = np.clip(strength[voiced], 0, 1 - 1e-3)
+    hnr_db = float(np.mean(10 * np.log10(voiced_strength / (1 - voiced_strength)))) if voiced_strength.size else 0.0
+
+    return AcousticFeatures(
+        duration_seconds=duration,
+        rms_db=level_db,
+        snr_db=snr_db,
+        hnr_db=hnr_db,
+        pitch_hz=pitch,
+        voiced_ratio=voiced_ratio,
+        pauses=pauses,
+        # 30 dB over the noise floor is clean close-mic speech and 20 dB HNR a clear voice;
+        # HNR still rates chunks with no silence to measure the noise floor from
+        clarity_score=(_scale(snr_db, 0, 30) + _scale(hnr_db, 0, 20)) / 2 if active.any() else 0.0,
+        # -45 dBFS is barely audible, -15 dBFS is a strong, unclipped voice
+        volume_score=_scale(level_db, -45, -15) if active.any() else 0.0,
+        # Monotone speech stays within ~1 semitone, expressive speech spans 4+
+        pitch_variation_score=_scale(semitone_spread, 0, 4),
+    )
@@ -1,22 +1,22 @@
-import openai
+import asyncio
 import nltk
 import numpy as np
-from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords, wordnet
 from nltk import pos_tag
 from collections import Counter
 from typing import Dict, List, Tuple, Optional
 import logging
-import re
 import json
 from datetime import datetime
 from ..core.config import settings
+from ..core.resources import configure_nltk_data_path
+from .analysis_document import AnalysisDocument
+from .filler_matcher import FillerMatch, FillerMatcher
+from .llm_cache import cache_key, llm_cache
+from .llm_client import llm_client
 
-# Download required NLTK data
-nltk.download('punkt', quiet=True)
-nltk.download('stopwords', quiet=True)
-nltk.download('wordnet', quiet=True)
-nltk.download('averaged_perceptron_tagger', quiet=True)
+# NLTK data is vendored by `python prepare_resources.py`
+configure_nltk_data_path()
 
 class DebateMetrics:
     """Class to store and calculate various debate metrics"""
@@ -44,11 +44,17 @@ class AIAnalyzer:
         r'\buh+\b', r'\bum+\b', r'\ber+\b', r'\bah+\b', r'\bhm+\b', r'\bmm+\b'
     ]
     
+    # Fillers (including phrases) and hesitations in one compiled pass
+    DISFLUENCY_MATCHER = FillerMatcher(FILLER_WORDS, HESITATION_PATTERNS)
+    
+    # Part of the LLM cache key; bump whenever the feedback prompt changes
+    PROMPT_VERSION = "ai-analyzer-feedback-v1"
+    
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
         self.stop_words = set(stopwords.words('english'))
         self.lemmatizer = nltk.WordNetLemmatizer()
         self.metrics = DebateMetrics()
+        self.highlights: List[FillerMatch] = []
         self.session_history = []
         
     def _get_wordnet_pos(self, treebank_tag):
@@ -74,13 +80,27 @@ class AIAnalyzer:
         if not text.strip():
             return {"error": "No speech content to analyze"}
             
+        # Tokenizing and scoring is blocking work; keep it off the event loop
+        await asyncio.to_thread(self._compute_metrics, text, audio_duration)
+        
+        # Get AI feedback
+        feedback = await self._get_ai_feedback(text)
+        
+        # Store this analysis in session history
+        self.session_history.append(self.metrics)
+        
+        return self._format_analysis_results(feedback)
+        
+    def _compute_metrics(self, text: str, audio_duration: Optional[float]) -> None:
+        """Local (non-LLM) metrics for the text, stored in self.metrics"""
         # Reset metrics for new analysis
         self.metrics = DebateMetrics()
         self.metrics.transcript = text
         
-        # Basic text processing
-        sentences = sent_tokenize(text)
-        words = [word.lower() for word in word_tokenize(text) if word.isalnum()]
+        # Basic text processing (tokenized once, shared by every metric)
+        doc = AnalysisDocument(text)
+        sentences = doc.sentences
+        words = doc.words
         
         # Calculate basic metrics
         self.metrics.word_count = len(words)
@@ -89,26 +109,18 @@ class AIAnalyzer:
         self.metrics.sentence_count = len(sentences)
         
         # Analyze speech patterns
-        self._analyze_filler_words(words)
+        self.highlights = self.DISFLUENCY_MATCHER.find(doc.text)
+        self._analyze_disfluencies(self.highlights)
         self._analyze_vocabulary(words)
-        self._analyze_grammar(text)
-        self._analyze_hesitation(text)
+        self._analyze_grammar(doc)
         
         # Calculate speaking rate if audio duration is provided
         if audio_duration and audio_duration > 0:
             self.metrics.speaking_rate = self.metrics.word_count / (audio_duration / 60)  # Words per minute
         
-        # Get AI feedback
-        feedback = await self._get_ai_feedback(text)
-        
-        # Store this analysis in session history
-        self.session_history.append(self.metrics)
-        
-        return self._format_analysis_results(feedback)
-        
-    def _analyze_filler_words(self, words: List[str]) -> None:
-        """Count filler words in the speech"""
-        self.metrics.filler_word_count = sum(1 for word in words if word.lower() in self.FILLER_WORDS)
+    def _analyze_disfluencies(self, matches: List[FillerMatch]) -> None:
+        """Count filler words/phrases and hesitation patterns in the speech"""
+        self.metrics.filler_word_count, self.metrics.hesitation_count = self.DISFLUENCY_MATCHER.count(matches)
         
     def _analyze_vocabulary(self, words: List[str]) -> None:
         """Analyze vocabulary richness and complexity"""
@@ -118,24 +130,16 @@ class AIAnalyzer:
             
         # TODO: Add more sophisticated vocabulary analysis (word frequency, lexical sophistication, etc.)
         
-    def _analyze_grammar(self, text: str) -> None:
+    def _analyze_grammar(self, doc: AnalysisDocument) -> None:
         """Perform basic grammar analysis"""
         # Simple grammar check - count sentence fragments, run-ons, etc.
         # This is a simplified version - consider using a proper grammar checker
-        sentences = sent_tokenize(text)
         self.metrics.grammar_errors = 0
         
-        for sent in sentences:
-            words = word_tokenize(sent)
+        for words in doc.sentence_tokens:
             if len(words) < 3:  # Very short sentence might be a fragment
                 self.metrics.grammar_errors += 1
                 
-    def _analyze_hesitation(self, text: str) -> None:
-        """Detect hesitation patterns in speech"""
-        self.metrics.hesitation_count = 0
-        for pattern in self.HESITATION_PATTERNS:
-            self.metrics.hesitation_count += len(re.findall(pattern, text.lower()))
-            
     def _format_analysis_results(self, feedback: Dict) -> Dict:
         """Format the analysis results into a structured response"""
         return {
@@ -152,6 +156,7 @@ class AIAnalyzer:
                 "speaking_rate": round(self.metrics.speaking_rate, 1) if self.metrics.speaking_rate > 0 else None,
                 "overall_score": self._calculate_overall_score()
             },
+            "highlights": [match.to_dict() for match in self.highlights],
             "feedback": feedback,
             "timestamp": self.metrics.timestamp.isoformat()
         }
@@ -181,7 +186,15 @@ class AIAnalyzer:
     async def _get_ai_feedback(self, text: str) -> Dict:
         """
         Get detailed feedback from OpenAI's API with structured analysis
+        
+        Successful responses are cached by transcript, so repeats of the
+        same speech do not call the API again.
         """
+        key = cache_key(self.PROMPT_VERSION, settings.OPENAI_MODEL, text)
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = """
             You are a professional debate coach. Analyze the following speech and provide feedback in this JSON format:
@@ -203,20 +216,20 @@ class AIAnalyzer:
             Speech to analyze:
             """
             
-            response = self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL or "gpt-4",
-                messages=[
+            content = await llm_client.complete(
+                [
                     {"role": "system", "content": "You are a professional debate coach. Provide detailed, constructive feedback."},
                     {"role": "user", "content": prompt + text}
                 ],
                 temperature=0.7,
                 max_tokens=1000,
-                response_format={"type": "json_object"}
+                json_response=True
             )
             
             # Parse the JSON response
             try:
-                feedback = json.loads(response.choices[0].message.content)
+                feedback = json.loads(content)
+                await llm_cache.set(key, feedback)
                 return feedback
             except json.JSONDecodeError:
                 logging.error("Failed to parse AI feedback as JSON")
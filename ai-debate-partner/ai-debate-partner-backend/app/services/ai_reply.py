@@ -0,0 +1,27 @@
+from typing import AsyncIterator, Dict, List
+
+from ..core.config import settings
+from .llm_client import llm_client
+
+REPLY_SYSTEM_PROMPT = (
+    "You are a sparring partner in a live debate practice. Reply to the speaker's "
+    "latest point in at most two sentences, with a counterargument or one concrete tip."
+)
+
+
+def reply_messages(transcript: str, latest: str) -> List[Dict[str, str]]:
+    """Chat messages asking for a reply to `latest`, with the end of the transcript as context"""
+    context = transcript[-settings.AI_REPLY_CONTEXT_CHARS:].strip()
+    return [
+        {"role": "system", "content": REPLY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Debate so far:\n{context}\n\nLatest point:\n{latest}"},
+    ]
+
+
+def stream_reply(transcript: str, latest: str) -> AsyncIterator[str]:
+    """Reply text as it is generated; raises LLMError if generation fails"""
+    return llm_client.stream(
+        reply_messages(transcript, latest),
+        max_tokens=settings.AI_REPLY_MAX_TOKENS,
+        timeout_seconds=settings.AI_REPLY_TIMEOUT_SECONDS,
+    )
@@ -0,0 +1,67 @@
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+from nltk import pos_tag
+from nltk.tokenize import sent_tokenize, word_tokenize
+
+from ..core.resources import configure_nltk_data_path
+
+try:
+    from textblob import TextBlob
+except ImportError:
+    TextBlob = None
+    print("Warning: TextBlob not installed. Some features may be limited.")
+
+# NLTK data is vendored by `python prepare_resources.py`
+configure_nltk_data_path()
+
+
+class AnalysisDocument:
+    """
+    Text of a speech chunk with its NLP annotations computed once and cached.
+
+    Sentence splitting, tokenization, POS tagging and sentiment are each run
+    at most once per document, on first access, and every metric function
+    reads them from here instead of re-tokenizing the text.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @cached_property
+    def lower_text(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        return sent_tokenize(self.text)
+
+    @cached_property
+    def sentence_tokens(self) -> List[List[str]]:
+        """Tokens of each sentence (word_tokenize splits into sentences first anyway)"""
+        return [word_tokenize(sentence, preserve_line=True) for sentence in self.sentences]
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        return [token for sentence in self.sentence_tokens for token in sentence]
+
+    @cached_property
+    def lower_tokens(self) -> List[str]:
+        return [token.lower() for token in self.tokens]
+
+    @cached_property
+    def words(self) -> List[str]:
+        """Lowercased alphanumeric tokens, without punctuation"""
+        return [token for token in self.lower_tokens if token.isalnum()]
+
+    @cached_property
+    def pos_tags(self) -> List[Tuple[str, str]]:
+        """Penn Treebank tags for word tokens (punctuation excluded, as TextBlob.tags does)"""
+        return [(word, tag) for word, tag in pos_tag(self.tokens) if any(c.isalnum() for c in word)]
+
+    @cached_property
+    def sentiment(self) -> Optional[float]:
+        """Polarity in [-1, 1], or None when TextBlob is not installed"""
+        if TextBlob is None:
+            return None
+        return TextBlob(self.text).sentiment.polarity
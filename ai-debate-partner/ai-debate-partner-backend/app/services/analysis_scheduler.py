@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = (".", "!", "?")
+
+
+class DebouncedAnalysis:
+    """
+    Runs an expensive analysis (LLM feedback) of a session's transcript on
+    debounced windows instead of on every chunk.
+
+    notify() is called with the whole transcript after each recognized
+    chunk. A run starts once no new text has arrived for debounce_seconds,
+    at a sentence end if min_interval_seconds have passed since the last
+    run, or at the latest max_wait_seconds after the oldest unanalyzed text.
+    Only one run is in flight: when a run is due while another is still
+    going, it is deferred and starts as soon as that one completes, so slow
+    analyses always finish. flush() cancels a run on a stale transcript,
+    analyzes whatever is new right away and waits for the result (for
+    session_end).
+
+    Each result is passed to on_result(result, final, stale): final is True
+    for results delivered during flush(), stale when newer text arrived
+    while the run was in flight and a run on it is already due. Stale results
+    are still delivered, since under continuous speech every result would be
+    stale by the time it completes.
+    """
+
+    def __init__(
+        self,
+        analyze: Callable[[str], Awaitable[Any]],
+        on_result: Callable[[Any, bool, bool], Awaitable[None]],
+        debounce_seconds: float,
+        min_interval_seconds: float,
+        max_wait_seconds: float,
+    ):
+        self.analyze = analyze
+        self.on_result = on_result
+        self.debounce_seconds = debounce_seconds
+        self.min_interval_seconds = min_interval_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._transcript = ""
+        self._run_transcript = ""
+        self._analyzed = ""
+        self._flushing = False
+        self._dirty = False
+        self._pending_since: Optional[float] = None
+        self._last_start: Optional[float] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._run: Optional[asyncio.Task] = None
+
+        self.notifications = 0
+        self.started = 0
+        self.completed = 0
+        self.deferred = 0
+        self.cancelled = 0
+        self.stale = 0
+        self.failed = 0
+
+    def notify(self, transcript: str) -> None:
+        """Record new text and (re)schedule the next run"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        self.notifications += 1
+        self._transcript = transcript
+        if self._pending_since is None:
+            self._pending_since = now
+
+        delay = self.debounce_seconds
+        if transcript.rstrip().endswith(_SENTENCE_END):
+            since_last = now - self._last_start if self._last_start is not None else self.min_interval_seconds
+            delay = min(delay, max(0.0, self.min_interval_seconds - since_last))
+        delay = min(delay, max(0.0, self._pending_since + self.max_wait_seconds - now))
+
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, self._due)
+
+    def _due(self) -> None:
+        self._timer = None
+        if self._run is not None and not self._run.done():
+            # Picked up by _execute once the run in flight completes
+            self._dirty = True
+            self.deferred += 1
+            return
+        self._start()
+
+    def _start(self) -> None:
+        self._dirty = False
+        self._pending_since = None
+        self._last_start = asyncio.get_running_loop().time()
+        self.started += 1
+        self._run_transcript = self._transcript
+        self._run = asyncio.create_task(self._execute(self._transcript))
+
+    async def _execute(self, transcript: str) -> None:
+        try:
+            result = await self.analyze(transcript)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Scheduled analysis failed: {e}")
+        else:
+            self.completed += 1
+            self._analyzed = transcript
+            stale = self._dirty and self._transcript != transcript
+            if stale:
+                self.stale += 1
+            try:
+                await self.on_result(result, self._flushing, stale)
+            except Exception as e:
+                logger.error(f"Delivering scheduled analysis failed: {e}")
+        if self._dirty and not self._flushing and self._transcript != transcript:
+            self._start()
+
+    async def flush(self) -> None:
+        """Analyze any text not yet covered by a run and wait for the result"""
+        self._flushing = True
+        try:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            in_flight = self._run is not None and not self._run.done()
+            if self._transcript.strip() and self._transcript != self._analyzed:
+                # A run already analyzing the current transcript is awaited, not restarted
+                if not (in_flight and self._run_transcript == self._transcript):
+                    if in_flight:
+                        self._run.cancel()
+                        self.cancelled += 1
+                    self._start()
+            elif not in_flight:
+                return
+            try:
+                await self._run
+            except asyncio.CancelledError:
+                pass
+        finally:
+            # The connection may carry on after session_end; later runs are live again
+            self._flushing = False
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._run is not None and not self._run.done():
+            self._run.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._pending_since is not None,
+            "in_flight": self._run is not None and not self._run.done(),
+            "notifications": self.notifications,
+            "started": self.started,
+            "deferred": self.deferred,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "stale": self.stale,
+            "failed": self.failed,
+        }
@@ -1,12 +1,15 @@
-import openai
 from typing import List, Dict, Any
 from ..core.config import settings
 from ..models.schemas import Feedback, AnalysisType
+from .llm_cache import cache_key, llm_cache
+from .llm_client import llm_client
 import json
 
 class AnalysisService:
+    # Part of the LLM cache key; bump whenever system_prompt or the request changes
+    PROMPT_VERSION = "analysis-service-v1"
+    
     def __init__(self):
-        openai.api_key = settings.OPENAI_API_KEY
         self.system_prompt = """You are an expert debate coach and public speaking analyst. 
         Analyze the provided debate transcript and provide detailed feedback on the following aspects:
         1. Grammar and sentence structure
@@ -19,19 +22,20 @@ class AnalysisService:
     async def analyze_transcript(self, transcript: str) -> Dict[str, Any]:
         """Analyze the transcript and return feedback."""
         try:
-            # Call OpenAI API for analysis
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": f"Please analyze this debate transcript:\n\n{transcript}"}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            # Parse the response
-            analysis = response.choices[0].message.content
+            # Repeated transcripts (re-uploads, replays) reuse the cached analysis
+            key = cache_key(self.PROMPT_VERSION, settings.OPENAI_MODEL, transcript)
+            analysis = await llm_cache.get(key)
+            if analysis is None:
+                # Call OpenAI API for analysis
+                analysis = await llm_client.complete(
+                    [
+                        {"role": "system", "content": self.system_prompt},
+                        {"role": "user", "content": f"Please analyze this debate transcript:\n\n{transcript}"}
+                    ],
+                    temperature=0.7,
+                    max_tokens=1000
+                )
+                await llm_cache.set(key, analysis)
             
             # Generate structured feedback
             feedback = self._generate_structured_feedback(analysis, transcript)
@@ -0,0 +1,165 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.models import AnalysisType, AnalyticsRollup, Feedback, Session as DBSession
+
+
+class ScorePoint(NamedTuple):
+    user_id: Optional[str]
+    analysis_type: AnalysisType
+    session_time: datetime  # the session's created_at, the regression's x
+    score: float
+
+
+class CategorySums(NamedTuple):
+    """Least-squares inputs for one category, x in days since some origin"""
+    count: int
+    sum_x: float
+    sum_y: float
+    sum_xy: float
+    sum_xx: float
+
+    def __add__(self, other: "CategorySums") -> "CategorySums":
+        return CategorySums(*(a + b for a, b in zip(self, other)))
+
+    @property
+    def average(self) -> float:
+        return self.sum_y / self.count
+
+    @property
+    def slope(self) -> float:
+        """Score change per day (0 if x does not vary)"""
+        denominator = self.count * self.sum_xx - self.sum_x ** 2
+        if abs(denominator) <= 1e-9:
+            return 0
+        return (self.count * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+
+def _day_fraction(moment: datetime) -> float:
+    return (moment - datetime.combine(moment.date(), time())).total_seconds() / 86400
+
+
+def record_scores(db: Session, points: Iterable[ScorePoint]) -> None:
+    """
+    Add feedback scores to the rollup, in the caller's transaction.
+
+    Points are summed per (user, category, day) first, then applied with a
+    single executemany upsert. Sessions without a user are not rolled up.
+    """
+    rows: Dict[Tuple[str, AnalysisType, date], List[float]] = {}
+    for point in points:
+        if point.user_id is None:
+            continue
+        x = _day_fraction(point.session_time)
+        sums = rows.setdefault((point.user_id, AnalysisType(point.analysis_type), point.session_time.date()), [0, 0.0, 0.0, 0.0, 0.0])
+        sums[0] += 1
+        sums[1] += point.score
+        sums[2] += x
+        sums[3] += x * x
+        sums[4] += x * point.score
+    if not rows:
+        return
+
+    statement = sqlite_insert(AnalyticsRollup)
+    statement = statement.on_conflict_do_update(
+        index_elements=[AnalyticsRollup.user_id, AnalyticsRollup.analysis_type, AnalyticsRollup.day],
+        set_={
+            column: getattr(AnalyticsRollup, column) + getattr(statement.excluded, column)
+            for column in ("count", "sum", "sum_x", "sum_xx", "sum_xy")
+        },
+    )
+    db.execute(statement, [
+        {
+            "user_id": user_id, "analysis_type": analysis_type, "day": day,
+            "count": count, "sum": total, "sum_x": sum_x, "sum_xx": sum_xx, "sum_xy": sum_xy,
+        }
+        for (user_id, analysis_type, day), (count, total, sum_x, sum_xx, sum_xy) in rows.items()
+    ])
+
+
+def backfill(db: Session) -> int:
+    """Rebuild the whole rollup from feedback rows in one INSERT ... SELECT; returns rows written"""
+    x = func.julianday(DBSession.created_at) - func.julianday(func.date(DBSession.created_at))
+    y = Feedback.score
+    day = func.date(DBSession.created_at)
+    source = select(
+        DBSession.user_id,
+        Feedback.analysis_type,
+        day,
+        func.count(y),
+        func.sum(y),
+        func.sum(x),
+        func.sum(x * x),
+        func.sum(x * y),
+    ).join(
+        DBSession, Feedback.session_id == DBSession.id
+    ).where(
+        DBSession.user_id.is_not(None), y.is_not(None)
+    ).group_by(DBSession.user_id, Feedback.analysis_type, day)
+
+    db.execute(delete(AnalyticsRollup))
+    result = db.execute(insert(AnalyticsRollup).from_select(
+        ["user_id", "analysis_type", "day", "count", "sum", "sum_x", "sum_xx", "sum_xy"], source
+    ))
+    return result.rowcount
+
+
+async def category_sums(db: AsyncSession, user_id: str, since: datetime) -> Dict[AnalysisType, CategorySums]:
+    """
+    Least-squares inputs per category for feedback on the user's sessions
+    created at or after `since`, with x in days since `since`.
+
+    Whole days come from the rollup (one row per category and day); only
+    the partial first day is aggregated from feedback rows.
+    """
+    first_full_day = since.date() if since.time() == time() else since.date() + timedelta(days=1)
+    totals: Dict[AnalysisType, CategorySums] = {}
+
+    # Each day's sums are shifted from time-of-day to days since `since`
+    offset = func.julianday(AnalyticsRollup.day) - func.julianday(literal(since))
+    rollup = await db.execute(
+        select(
+            AnalyticsRollup.analysis_type,
+            func.sum(AnalyticsRollup.count),
+            func.sum(AnalyticsRollup.sum_x + offset * AnalyticsRollup.count),
+            func.sum(AnalyticsRollup.sum),
+            func.sum(AnalyticsRollup.sum_xy + offset * AnalyticsRollup.sum),
+            func.sum(AnalyticsRollup.sum_xx + 2 * offset * AnalyticsRollup.sum_x + offset * offset * AnalyticsRollup.count),
+        ).where(
+            AnalyticsRollup.user_id == user_id,
+            AnalyticsRollup.day >= first_full_day
+        ).group_by(AnalyticsRollup.analysis_type)
+    )
+    for analysis_type, *sums in rollup:
+        totals[analysis_type] = CategorySums(*sums)
+
+    if first_full_day > since.date():
+        x = func.julianday(DBSession.created_at) - func.julianday(literal(since))
+        y = Feedback.score
+        partial = await db.execute(
+            select(
+                Feedback.analysis_type,
+                func.count(y),
+                func.sum(x),
+                func.sum(y),
+                func.sum(x * y),
+                func.sum(x * x),
+            ).join(
+                DBSession, Feedback.session_id == DBSession.id
+            ).where(
+                DBSession.user_id == user_id,
+                DBSession.created_at >= since,
+                DBSession.created_at < datetime.combine(first_full_day, time())
+            ).group_by(Feedback.analysis_type)
+        )
+        for analysis_type, *sums in partial:
+            if sums[0]:
+                sums = CategorySums(*sums)
+                totals[analysis_type] = totals[analysis_type] + sums if analysis_type in totals else sums
+
+    return totals
@@ -0,0 +1,133 @@
+import logging
+import subprocess
+import threading
+from collections import deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Size of each read from ffmpeg's stdout
+READ_SIZE = 8192
+
+
+class DecoderError(Exception):
+    """Raised when the ffmpeg decoder process fails"""
+
+
+class StreamingDecoder:
+    """
+    Long-lived ffmpeg process that decodes a continuous WebM/Ogg Opus stream
+    into 16-bit mono PCM.
+
+    Compressed bytes are written to ffmpeg's stdin as they arrive and decoded
+    PCM is collected from stdout by a reader thread, so there is one process
+    per session instead of one per chunk, and nothing touches the disk.
+    """
+
+    def __init__(self, ffmpeg_path: str, input_format: str = "webm", sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self.input_format = input_format
+        self._pcm = bytearray()
+        self._condition = threading.Condition()
+        self._stderr_tail = deque(maxlen=20)
+        self._eof = False
+
+        self._process = subprocess.Popen(
+            [
+                ffmpeg_path, "-hide_banner", "-loglevel", "error",
+                "-fflags", "+nobuffer", "-probesize", "32", "-analyzeduration", "0",
+                "-f", input_format, "-i", "pipe:0",
+                "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate),
+                "-flush_packets", "1",
+                "pipe:1",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+        self._stdout_thread = threading.Thread(target=self._read_stdout, daemon=True)
+        self._stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stdout_thread.start()
+        self._stderr_thread.start()
+        logger.debug(f"Started streaming decoder (pid {self._process.pid}, format {input_format})")
+
+    @staticmethod
+    def format_for_mime_type(mime_type: str) -> str:
+        """Map a MediaRecorder MIME type to the ffmpeg input format"""
+        return "webm" if "webm" in mime_type.lower() else "ogg"
+
+    @property
+    def closed(self) -> bool:
+        return self._process.poll() is not None
+
+    def _read_stdout(self) -> None:
+        stdout = self._process.stdout
+        while True:
+            data = stdout.read(READ_SIZE)
+            with self._condition:
+                if not data:
+                    self._eof = True
+                    self._condition.notify_all()
+                    return
+                self._pcm.extend(data)
+                self._condition.notify_all()
+
+    def _read_stderr(self) -> None:
+        for line in iter(self._process.stderr.readline, b""):
+            message = line.decode(errors="replace").rstrip()
+            self._stderr_tail.append(message)
+            logger.debug(f"ffmpeg: {message}")
+
+    def _drain(self) -> bytes:
+        # Only hand out whole 16-bit samples
+        usable = len(self._pcm) - len(self._pcm) % 2
+        pcm = bytes(self._pcm[:usable])
+        del self._pcm[:usable]
+        return pcm
+
+    def feed(self, data: bytes, timeout: float = 0.2) -> bytes:
+        """
+        Write compressed audio to the decoder and return the PCM decoded so far.
+
+        ffmpeg decodes asynchronously, so PCM for the tail of this chunk may
+        only be returned by the next call (or by close()).
+
+        Args:
+            data: Compressed audio bytes, continuing the session's stream
+            timeout: Seconds to wait for new PCM when none is buffered yet
+
+        Returns:
+            Raw little-endian 16-bit mono PCM at self.sample_rate
+        """
+        if self.closed:
+            raise DecoderError(f"Decoder exited: {self.error_output()}")
+        try:
+            self._process.stdin.write(data)
+        except (BrokenPipeError, OSError) as e:
+            raise DecoderError(f"Failed to write to decoder: {e}; {self.error_output()}")
+
+        with self._condition:
+            if len(self._pcm) < 2 and not self._eof:
+                self._condition.wait(timeout)
+            return self._drain()
+
+    def close(self, timeout: float = 5.0) -> bytes:
+        """Flush the stream, stop ffmpeg and return any remaining PCM"""
+        try:
+            if self._process.stdin and not self._process.stdin.closed:
+                self._process.stdin.close()
+        except OSError:
+            pass
+        self._stdout_thread.join(timeout)
+        try:
+            self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        with self._condition:
+            return self._drain()
+
+    def error_output(self) -> Optional[str]:
+        """Last lines written by ffmpeg to stderr"""
+        return "\n".join(self._stderr_tail) or None
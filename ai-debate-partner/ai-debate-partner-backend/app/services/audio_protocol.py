@@ -0,0 +1,73 @@
+"""
+Binary framing for audio sent over the debate WebSocket.
+
+Audio chunks travel as binary WebSocket messages instead of base64 inside
+JSON. Each message is a fixed header, the MIME type, then the raw
+MediaRecorder (Opus/WebM or Ogg) bytes:
+
+    offset  size  field
+    0       1     protocol version (FRAME_VERSION)
+    1       1     length of the MIME type in bytes (n)
+    2       4     sequence number, uint32 big-endian
+    6       4     chunk duration in milliseconds, uint32 big-endian
+    10      n     MIME type, ASCII
+    10 + n  ...   audio payload
+
+Control messages (connection_init, ping, session_end) stay JSON text frames.
+"""
+import struct
+from typing import NamedTuple, Union
+
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("!BBII")
+DEFAULT_MIME_TYPE = "audio/webm;codecs=opus"
+
+
+class FrameError(ValueError):
+    """Raised when a binary message is not a valid audio frame"""
+
+
+class AudioFrame(NamedTuple):
+    sequence: int
+    duration_seconds: float
+    mime_type: str
+    payload: memoryview
+
+
+def parse_audio_frame(data: Union[bytes, bytearray]) -> AudioFrame:
+    """
+    Parse a binary WebSocket message into an AudioFrame.
+
+    The payload is returned as a memoryview over the received message so the
+    audio bytes are never copied on the event loop.
+
+    Args:
+        data: The raw binary message
+
+    Returns:
+        The parsed AudioFrame
+    """
+    if len(data) < FRAME_HEADER.size:
+        raise FrameError(f"Frame too short: {len(data)} bytes")
+
+    version, mime_length, sequence, duration_ms = FRAME_HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise FrameError(f"Unsupported frame version: {version}")
+
+    payload_offset = FRAME_HEADER.size + mime_length
+    if len(data) <= payload_offset:
+        raise FrameError("Frame has no audio payload")
+
+    view = memoryview(data)
+    try:
+        mime_type = bytes(view[FRAME_HEADER.size:payload_offset]).decode("ascii") or DEFAULT_MIME_TYPE
+    except UnicodeDecodeError:
+        raise FrameError("MIME type is not ASCII")
+
+    return AudioFrame(
+        sequence=sequence,
+        duration_seconds=duration_ms / 1000,
+        mime_type=mime_type,
+        payload=view[payload_offset:],
+    )
+
@@ -0,0 +1,183 @@
+import logging
+import os
+import queue
+import random
+import re
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Optional, Set
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+_CLOSE = object()
+_STOP = object()
+
+
+class DebugCapture:
+    """
+    Opt-in capture of received audio for debugging, off the hot path.
+
+    Whole sessions are captured, so each capture file is a decodable stream:
+    a session is selected when it opts in (connection_init with
+    "debug_capture": true) or, with probability sample_rate, at random.
+    Chunks are handed to a single background writer thread through a
+    bounded queue; when the writer falls behind, chunks are dropped rather
+    than blocking the event loop. Session files rotate at max_file_bytes and
+    the oldest files are deleted once the directory exceeds max_total_bytes.
+
+    When disabled, no thread is started and capture() returns immediately.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        directory: str,
+        sample_rate: float,
+        max_file_bytes: int,
+        max_total_bytes: int,
+        queue_size: int,
+    ):
+        self.enabled = enabled
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._sessions: Set[str] = set()
+
+        self.captured = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.files_deleted = 0
+
+    def start_session(self, session_id: str, opt_in: bool = False) -> bool:
+        """Decide whether a session is captured; returns True if it is"""
+        if not self.enabled:
+            return False
+        if opt_in or random.random() < self.sample_rate:
+            self._sessions.add(session_id)
+            return True
+        return False
+
+    def capture(self, session_id: str, data: bytes, extension: str) -> None:
+        """Queue one chunk of a captured session for writing"""
+        if not self.enabled or session_id not in self._sessions:
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((session_id, bytes(data), extension))
+            self.captured += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def end_session(self, session_id: str) -> None:
+        if session_id in self._sessions:
+            self._sessions.discard(session_id)
+            if self._thread is not None:
+                try:
+                    self._queue.put_nowait((_CLOSE, session_id, None))
+                except queue.Full:
+                    # The writer closes files of sessions no longer captured on its own
+                    pass
+
+    def _start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name="debug-capture", daemon=True)
+        self._thread.start()
+        logger.info(f"Debug capture writing to {os.path.abspath(self.directory)}")
+
+    def _write_loop(self) -> None:
+        files: Dict[str, BinaryIO] = {}
+        file_index: Dict[str, int] = {}
+        # Size of every capture file, oldest first, including ones left by earlier runs
+        sizes: "OrderedDict[str, int]" = OrderedDict()
+        paths = (os.path.join(self.directory, name) for name in os.listdir(self.directory))
+        for path in sorted(filter(os.path.isfile, paths), key=os.path.getmtime):
+            sizes[path] = os.path.getsize(path)
+        total = sum(sizes.values())
+
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = None
+            # Sessions that ended without their close reaching the queue
+            for session_id in [key for key in files if key not in self._sessions]:
+                files.pop(session_id).close()
+            if item is None:
+                continue
+            if item is _STOP:
+                break
+            if item[0] is _CLOSE:
+                handle = files.pop(item[1], None)
+                if handle is not None:
+                    handle.close()
+                continue
+
+            session_id, data, extension = item
+            try:
+                handle = files.get(session_id)
+                if handle is not None and sizes.get(handle.name, 0) + len(data) > self.max_file_bytes:
+                    files.pop(session_id).close()
+                    file_index[session_id] += 1
+                    handle = None
+                if handle is None:
+                    index = file_index.setdefault(session_id, 0)
+                    path = os.path.join(self.directory, f"{_UNSAFE_NAME.sub('_', session_id)}-{index:03d}.{extension}")
+                    handle = files[session_id] = open(path, "ab")
+                    sizes.setdefault(path, 0)
+
+                handle.write(data)
+                handle.flush()
+                sizes[handle.name] += len(data)
+                total += len(data)
+                self.bytes_written += len(data)
+
+                # Keep the directory under its cap by deleting the oldest files
+                while total > self.max_total_bytes and len(sizes) > 1:
+                    path, size = sizes.popitem(last=False)
+                    for key, open_file in list(files.items()):
+                        if open_file.name == path:
+                            files.pop(key).close()
+                    os.remove(path)
+                    total -= size
+                    self.files_deleted += 1
+            except OSError as e:
+                logger.warning(f"Debug capture write failed: {e}")
+
+        for handle in files.values():
+            handle.close()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "sessions": len(self._sessions),
+            "captured": self.captured,
+            "dropped": self.dropped,
+            "bytes_written": self.bytes_written,
+            "files_deleted": self.files_deleted,
+        }
+
+    def shutdown(self) -> None:
+        if self._thread is not None:
+            try:
+                self._queue.put(_STOP, timeout=5)
+            except queue.Full:
+                logger.warning("Debug capture writer did not drain its queue; stopping without it")
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+debug_capture = DebugCapture(
+    settings.DEBUG_CAPTURE_ENABLED,
+    settings.DEBUG_CAPTURE_DIR,
+    settings.DEBUG_CAPTURE_SAMPLE_RATE,
+    settings.DEBUG_CAPTURE_MAX_FILE_BYTES,
+    settings.DEBUG_CAPTURE_MAX_TOTAL_BYTES,
+    settings.DEBUG_CAPTURE_QUEUE_SIZE,
+)
@@ -0,0 +1,59 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+
+class FillerMatch(NamedTuple):
+    phrase: str  # normalized: lowercase, single spaces
+    kind: str    # "filler" or "hesitation"
+    start: int   # character offsets into the analyzed text
+    end: int
+
+    def to_dict(self) -> Dict:
+        return self._asdict()
+
+
+class FillerMatcher:
+    """
+    Finds filler words, multi-word filler phrases ("you know", "i mean") and
+    hesitation sounds in a single linear pass.
+
+    All phrases and hesitation patterns are compiled into one alternation
+    regex. Hesitation patterns are tried first, longer phrases before
+    shorter ones, and phrase words may be separated by any whitespace.
+    """
+
+    def __init__(self, filler_phrases: Iterable[str], hesitation_patterns: Iterable[str] = ()):
+        self.filler_phrases = frozenset(" ".join(p.lower().split()) for p in filler_phrases)
+        hesitation_patterns = list(hesitation_patterns)
+
+        alternatives = []
+        if hesitation_patterns:
+            alternatives.append(f"(?P<hesitation>{'|'.join(hesitation_patterns)})")
+        if self.filler_phrases:
+            phrases = sorted(self.filler_phrases, key=len, reverse=True)
+            phrase_patterns = (r"\s+".join(map(re.escape, p.split())) for p in phrases)
+            alternatives.append(rf"(?P<filler>\b(?:{'|'.join(phrase_patterns)})\b)")
+        self._regex = re.compile("|".join(alternatives) or r"(?!)", re.IGNORECASE)
+
+    def find(self, text: str) -> List[FillerMatch]:
+        """All filler and hesitation occurrences, in order, with their positions"""
+        return [
+            FillerMatch(
+                phrase=" ".join(m.group().lower().split()),
+                kind=m.lastgroup,
+                start=m.start(),
+                end=m.end(),
+            )
+            for m in self._regex.finditer(text)
+        ]
+
+    def count(self, matches: List[FillerMatch]) -> Tuple[int, int]:
+        """
+        Count (fillers, hesitations) in the result of find().
+
+        A hesitation sound that is also a listed filler ("um", "uh") counts
+        towards both, as the separate word list and patterns did before.
+        """
+        fillers = sum(1 for m in matches if m.phrase in self.filler_phrases)
+        hesitations = sum(1 for m in matches if m.kind == "hesitation")
+        return fillers, hesitations
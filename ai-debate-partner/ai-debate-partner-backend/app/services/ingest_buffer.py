@@ -0,0 +1,174 @@
+import asyncio
+import enum
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+
+class OverflowPolicy(str, enum.Enum):
+    COALESCE = "coalesce"
+    DROP_OLDEST = "drop_oldest"
+    THROTTLE = "throttle"
+
+
+class AudioChunk(NamedTuple):
+    payload: bytes
+    mime_type: str
+    duration_seconds: float
+    sequence: Optional[int] = None
+    # False once the chunk has been dropped: it is still decoded, so the
+    # compressed stream stays intact, but it is never sent to the recognizer
+    recognize: bool = True
+
+
+class _Entry:
+    """A queued chunk; merged chunks keep their payloads as parts until popped"""
+    __slots__ = ("parts", "size", "mime_type", "duration_seconds", "sequence", "recognize")
+
+    def __init__(self, chunk: AudioChunk):
+        self.parts: List[bytes] = [chunk.payload]
+        self.size = len(chunk.payload)
+        self.mime_type = chunk.mime_type
+        self.duration_seconds = chunk.duration_seconds
+        self.sequence = chunk.sequence
+        self.recognize = chunk.recognize
+
+    def absorb(self, newer: "_Entry") -> None:
+        """Append a newer entry's audio to this one"""
+        self.parts.extend(newer.parts)
+        self.size += newer.size
+        self.mime_type = newer.mime_type
+        self.duration_seconds += newer.duration_seconds
+        self.sequence = newer.sequence
+
+    def to_chunk(self) -> AudioChunk:
+        payload = self.parts[0] if len(self.parts) == 1 else b"".join(self.parts)
+        return AudioChunk(payload, self.mime_type, self.duration_seconds, self.sequence, self.recognize)
+
+
+class IngestBuffer:
+    """
+    Per-session ring buffer between the WebSocket receive loop and the
+    session worker.
+
+    Once more than high_water_mark chunks are waiting for recognition the
+    overflow policy applies:
+
+    - coalesce: the two newest chunks are merged into one, so the backlog is
+      recognized in fewer, larger calls and no audio is lost
+    - drop_oldest: the oldest waiting chunk is dropped from recognition.
+      WebM/Ogg streams cannot skip bytes, so dropped chunks are merged into a
+      single decode-only entry at the head which the worker decodes and
+      discards
+    - throttle: the chunk is kept and push() returns True so the caller can
+      ask the client to slow down. If the client ignores it and the backlog
+      reaches twice the high-water mark, chunks are coalesced instead
+
+    The buffer therefore never holds more than high_water_mark + 1
+    recognizable chunks (2 * high_water_mark when throttling) plus one
+    decode-only entry. Merged payloads are joined once, when popped.
+
+    Independently of the policy, the buffer holds at most max_bytes (0 for
+    no limit): beyond that the oldest entries are discarded without being
+    decoded, keeping at least the newest one. This is the last resort for a
+    session whose decoding cannot keep up at all; ffmpeg resynchronizes at
+    the next cluster of the stream. Nothing is discarded before the first
+    chunk, which carries the stream header, has been popped.
+    """
+
+    def __init__(self, high_water_mark: int, policy: OverflowPolicy = OverflowPolicy.COALESCE, max_bytes: int = 0):
+        self.high_water_mark = max(1, high_water_mark)
+        self.policy = OverflowPolicy(policy)
+        self.max_bytes = max_bytes
+        self._chunks: Deque[_Entry] = deque()
+        self._pending_recognition = 0
+        self._not_empty = asyncio.Event()
+        self._header_popped = False
+        self.size_bytes = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.throttled = 0
+        self.discarded_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    @property
+    def depth(self) -> int:
+        """Number of chunks waiting for recognition"""
+        return self._pending_recognition
+
+    def push(self, chunk: AudioChunk) -> bool:
+        """
+        Add a received chunk, applying the overflow policy.
+
+        Returns:
+            True if the client should be sent a throttle message
+        """
+        self._chunks.append(_Entry(chunk))
+        self.size_bytes += len(chunk.payload)
+        self._pending_recognition += 1
+        self._not_empty.set()
+        if self.max_bytes and self.size_bytes > self.max_bytes:
+            self._discard_oldest()
+
+        if self._pending_recognition <= self.high_water_mark:
+            return False
+
+        if self.policy == OverflowPolicy.DROP_OLDEST:
+            self._drop_oldest()
+        elif self.policy == OverflowPolicy.THROTTLE and self._pending_recognition <= 2 * self.high_water_mark:
+            self.throttled += 1
+            return True
+        else:
+            self._coalesce_newest()
+        return self.policy == OverflowPolicy.THROTTLE
+
+    def _coalesce_newest(self) -> None:
+        newest = self._chunks.pop()
+        previous = self._chunks.pop()
+        previous.absorb(newest)
+        previous.recognize = True
+        self._chunks.append(previous)
+        self._pending_recognition -= 1
+        self.coalesced += 1
+
+    def _drop_oldest(self) -> None:
+        head = self._chunks[0]
+        if not head.recognize:
+            # Fold the oldest recognizable chunk into the decode-only head
+            oldest = self._chunks[1]
+            del self._chunks[1]
+            head.absorb(oldest)
+        head.recognize = False
+        self._pending_recognition -= 1
+        self.dropped += 1
+
+    def _discard_oldest(self) -> None:
+        while self._header_popped and self.size_bytes > self.max_bytes and len(self._chunks) > 1:
+            entry = self._chunks.popleft()
+            self.size_bytes -= entry.size
+            self.discarded_bytes += entry.size
+            if entry.recognize:
+                self._pending_recognition -= 1
+
+    async def pop(self) -> AudioChunk:
+        """Wait for and remove the oldest chunk"""
+        while not self._chunks:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        entry = self._chunks.popleft()
+        self.size_bytes -= entry.size
+        if entry.recognize:
+            self._pending_recognition -= 1
+        self._header_popped = True
+        return entry.to_chunk()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self.depth,
+            "size_bytes": self.size_bytes,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "throttled": self.throttled,
+            "discarded_bytes": self.discarded_bytes,
+        }
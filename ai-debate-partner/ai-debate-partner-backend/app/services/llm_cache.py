@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_transcript(text: str) -> str:
+    """Unicode NFC with whitespace runs collapsed, so re-transcribed repeats hash the same"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(prompt_version: str, model: str, transcript: str) -> str:
+    """Content address of one LLM request: prompt version, model and normalized transcript"""
+    digest = hashlib.sha256()
+    for part in (prompt_version, model, normalize_transcript(transcript)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of LLM responses keyed by cache_key().
+
+    An in-memory LRU of memory_entries responses sits in front of a SQLite
+    file at `path`. Entries expire ttl_seconds after they are stored; the
+    file is trimmed, least recently used first, to max_disk_bytes of
+    response data. Values must be JSON serializable.
+
+    Disk access runs on a worker thread so lookups never block the event
+    loop; the database is opened on first use.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        path: str,
+        memory_entries: int,
+        ttl_seconds: float,
+        max_disk_bytes: int,
+    ):
+        self.enabled = enabled
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Cached response for key, or None"""
+        if not self.enabled:
+            return None
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+
+        try:
+            entry = await asyncio.to_thread(self._disk_get, key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(key, *entry)
+        return entry[1]
+
+    async def set(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at, value)
+        try:
+            await asyncio.to_thread(self._disk_set, key, json.dumps(value), expires_at)
+            self.stores += 1
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used ON llm_cache (last_used)")
+            connection.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+            connection.commit()
+            self._disk_bytes = connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+            self._connection = connection
+        return self._connection
+
+    def _disk_get(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            now = time.time()
+            if expires_at <= now:
+                self._delete(connection, key)
+                connection.commit()
+                return None
+            connection.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            connection.commit()
+            return expires_at, json.loads(value)
+
+    def _disk_set(self, key: str, value: str, expires_at: float) -> None:
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            connection = self._connect()
+            self._delete(connection, key)
+            connection.execute(
+                "INSERT INTO llm_cache (key, value, size, expires_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, expires_at, time.time()),
+            )
+            self._disk_bytes += size
+            self._trim(connection)
+            connection.commit()
+
+    def _delete(self, connection: sqlite3.Connection, key: str) -> None:
+        row = connection.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._disk_bytes -= row[0]
+
+    def _trim(self, connection: sqlite3.Connection) -> None:
+        """Drop expired entries, then least recently used ones, until under max_disk_bytes"""
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        now = time.time()
+        expired = connection.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache WHERE expires_at <= ?", (now,)).fetchone()[0]
+        if expired:
+            connection.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._disk_bytes -= expired
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = connection.execute(
+                "SELECT key, size FROM llm_cache ORDER BY last_used LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                break
+            for key, size in rows:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                connection.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._disk_bytes -= size
+                self.evictions += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+llm_cache = LLMResponseCache(
+    settings.LLM_CACHE_ENABLED,
+    settings.LLM_CACHE_PATH,
+    settings.LLM_CACHE_MEMORY_ENTRIES,
+    settings.LLM_CACHE_TTL_SECONDS,
+    settings.LLM_CACHE_MAX_DISK_BYTES,
+)
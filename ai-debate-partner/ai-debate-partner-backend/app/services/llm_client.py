@@ -0,0 +1,247 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """A completion failed: a non-retryable error, retries exhausted or the deadline passed"""
+
+
+class _Flight:
+    """One in-flight request and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+def _is_retryable(error: Exception) -> bool:
+    import openai
+    if isinstance(error, (asyncio.TimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+class LLMClient:
+    """
+    Shared async client for chat completions.
+
+    - At most max_concurrency requests are sent at once; the rest wait for
+      a slot without blocking the event loop.
+    - Each call has a deadline (timeout_seconds unless given) covering the
+      wait for a slot, every attempt and the backoff between them.
+    - Connection errors, timeouts, 408/409/429 and 5xx responses are retried
+      up to max_retries times with full-jitter exponential backoff.
+    - Identical requests already in flight are coalesced: later callers
+      wait for the first one's result (and share its deadline). A request is
+      cancelled once every caller waiting on it has been cancelled.
+
+    base_url points the client at any OpenAI-compatible server, such as a
+    local stub in tests.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str],
+        model: str,
+        max_concurrency: int,
+        timeout_seconds: float,
+        max_retries: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = None
+        self._in_flight: Dict[str, _Flight] = {}
+
+        self.requests = 0
+        self.coalesced = 0
+        self.attempts = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _get_client(self):
+        if self._client is None:
+            # Imported on first use; the openai package takes most of a second to import
+            import openai
+            # Retries and timeouts are handled here, not by the SDK
+            self._client = openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return self._client
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        json_response: bool = False,
+        timeout_seconds: Optional[float] = None,
+    ) -> str:
+        """Content of the first choice; raises LLMError on failure"""
+        request: Dict[str, Any] = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if json_response:
+            request["response_format"] = {"type": "json_object"}
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+
+        flight = self._in_flight.get(key)
+        if flight is None:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + (timeout_seconds or self.timeout_seconds)
+            flight = _Flight(asyncio.ensure_future(self._request(request, deadline)))
+            self._in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        timeout_seconds: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the content of one completion piece by piece as it is generated;
+        raises LLMError on failure.
+
+        A stream holds a concurrency slot until it ends, is retried only until
+        the response starts and is never coalesced. The deadline covers the
+        whole stream.
+        """
+        import openai
+        request: Dict[str, Any] = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout_seconds or self.timeout_seconds)
+        self.requests += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError as e:
+            self.timeouts += 1
+            raise LLMError("LLM stream deadline exceeded waiting for a slot") from e
+        try:
+            response = await self._send(request, deadline, acquire=False)
+            try:
+                chunks = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                    except StopAsyncIteration:
+                        return
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except asyncio.TimeoutError as e:
+                self.timeouts += 1
+                raise LLMError("LLM stream deadline exceeded") from e
+            except openai.APIError as e:
+                self.failures += 1
+                raise LLMError(f"LLM stream failed: {e}") from e
+            finally:
+                await response.close()
+        finally:
+            self._semaphore.release()
+
+    async def _request(self, request: Dict[str, Any], deadline: float) -> str:
+        self.requests += 1
+        response = await self._send(request, deadline)
+        return response.choices[0].message.content
+
+    async def _send(self, request: Dict[str, Any], deadline: float, acquire: bool = True) -> Any:
+        """Create the completion, retrying transient errors until the deadline"""
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore if acquire else contextlib.nullcontext():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    self.attempts += 1
+                    return await asyncio.wait_for(
+                        self._get_client().chat.completions.create(**request), remaining
+                    )
+            except Exception as e:
+                if not _is_retryable(e):
+                    self.failures += 1
+                    raise LLMError(f"LLM request failed: {e}") from e
+                error = e
+
+            delay = random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+            if loop.time() + delay >= deadline:
+                self.timeouts += 1
+                raise LLMError(f"LLM request deadline exceeded after {attempt + 1} attempts: {error!r}") from error
+            if attempt >= self.max_retries:
+                self.failures += 1
+                raise LLMError(f"LLM request failed after {attempt + 1} attempts: {error!r}") from error
+            logger.warning(f"LLM request attempt {attempt + 1} failed ({error!r}); retrying in {delay:.2f}s")
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._in_flight),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
+
+llm_client = LLMClient(
+    settings.OPENAI_API_KEY,
+    settings.OPENAI_BASE_URL,
+    settings.OPENAI_MODEL,
+    settings.LLM_MAX_CONCURRENCY,
+    settings.LLM_TIMEOUT_SECONDS,
+    settings.LLM_MAX_RETRIES,
+    settings.LLM_RETRY_BASE_SECONDS,
+    settings.LLM_RETRY_MAX_SECONDS,
+)
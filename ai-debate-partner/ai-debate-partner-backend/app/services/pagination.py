@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+from typing import Optional, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+
+from ..models.models import Session
+
+Cursor = Tuple[datetime, str]
+
+
+def parse_cursor(after: str) -> Cursor:
+    """
+    Parse an `after` cursor of the form '<created_at ISO timestamp>,<session id>'.
+    Timestamps with an offset are converted to naive UTC, like created_at.
+    """
+    created_at, separator, session_id = after.partition(",")
+    if not separator or not session_id:
+        raise ValueError("cursor must be '<created_at>,<id>'")
+    timestamp = datetime.fromisoformat(created_at)
+    if timestamp.tzinfo is not None:
+        # created_at is stored as naive UTC
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp, session_id
+
+
+def format_cursor(session: Session) -> str:
+    return f"{session.created_at.isoformat()},{session.id}"
+
+
+def paginate_sessions(query: Select, limit: int, skip: int = 0, after: Optional[str] = None) -> Select:
+    """
+    Newest-first page of a sessions query.
+
+    With `after`, the page starts right after that session using a keyset
+    comparison on (created_at, id), which the composite indexes answer with
+    a range seek however deep the page is; otherwise `skip` is used as an
+    offset. Raises ValueError for a malformed cursor.
+    """
+    query = query.order_by(Session.created_at.desc(), Session.id.desc())
+    if after is not None:
+        query = query.where(tuple_(Session.created_at, Session.id) < parse_cursor(after))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def next_cursor(sessions: Sequence[Session], limit: int) -> Optional[str]:
+    """Cursor for the page after `sessions`, or None if this was the last page"""
+    if not sessions or len(sessions) < limit:
+        return None
+    return format_cursor(sessions[-1])
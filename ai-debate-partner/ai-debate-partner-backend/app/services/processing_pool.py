@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..core.config import settings
+from .ingest_buffer import AudioChunk, IngestBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessingPool:
+    """
+    Bounded thread pool for blocking work (audio decoding, speech recognition
+    and NLP analysis) so it never runs on the asyncio event loop.
+
+    At most max_pending jobs may be submitted at once; further callers wait
+    for a slot, which pushes back on the sessions producing the work.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="debate-worker")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) on the pool and return its result"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SessionWorker:
+    """
+    Processes one session's audio strictly in arrival order.
+
+    Received chunks go into the session's IngestBuffer, which is drained by
+    a single task, so a session never has two chunks in progress at once and
+    its backlog is bounded by the buffer's overflow policy.
+    """
+
+    def __init__(self, session_id: str, handler: Callable[[AudioChunk], Awaitable[None]], buffer: IngestBuffer):
+        self.session_id = session_id
+        self.buffer = buffer
+        self._handler = handler
+        self._busy = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def depth(self) -> int:
+        """Number of chunks waiting for recognition, including the one in progress"""
+        return self.buffer.depth + (1 if self._busy else 0)
+
+    def submit(self, chunk: AudioChunk) -> bool:
+        """
+        Queue a chunk for processing.
+
+        Returns:
+            True if the client should be asked to throttle
+        """
+        self._idle.clear()
+        return self.buffer.push(chunk)
+
+    async def drain(self) -> None:
+        """Wait until every submitted chunk has been processed"""
+        await self._idle.wait()
+
+    async def _run(self) -> None:
+        while True:
+            chunk = await self.buffer.pop()
+            self._busy = True
+            try:
+                await self._handler(chunk)
+            except Exception as e:
+                logger.error(f"Session {self.session_id}: chunk processing failed: {e}")
+            finally:
+                self._busy = False
+                if not self.buffer:
+                    self._idle.set()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.buffer.stats(), "depth": self.depth}
+
+    async def close(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+# Shared pool for the WebSocket pipeline and the REST services
+processing_pool = ProcessingPool(settings.PROCESSING_WORKERS, settings.PROCESSING_MAX_PENDING)
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import speech_recognition as sr
+
+from ..core.config import settings
+from .processing_pool import ProcessingPool, processing_pool
+
+logger = logging.getLogger(__name__)
+
+# Recognition failures use the speech_recognition exception types so callers
+# handle every backend the same way:
+#   sr.UnknownValueError - the audio contained no recognizable speech
+#   sr.RequestError      - the backend itself failed
+
+
+class RecognizerBackend:
+    """
+    Interface for speech-to-text engines.
+
+    Backends take raw 16-bit mono PCM and return text, or an empty string
+    when nothing was recognized. Engines that can decode several segments in
+    one inference call set supports_batching and override recognize_batch.
+    """
+    name = "base"
+    supports_batching = False
+
+    def recognize(self, pcm: bytes, sample_rate: int) -> str:
+        raise NotImplementedError
+
+    def recognize_batch(self, segments: List[bytes], sample_rate: int) -> List[str]:
+        return [self.recognize(pcm, sample_rate) for pcm in segments]
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API through speech_recognition (needs network access)"""
+    name = "google"
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, pcm: bytes, sample_rate: int) -> str:
+        try:
+            return self.recognizer.recognize_google(sr.AudioData(pcm, sample_rate, 2))
+        except sr.UnknownValueError:
+            return ""
+
+
+class VoskBackend(RecognizerBackend):
+    """
+    Offline recognition with Vosk (Kaldi) models on the CPU.
+
+    With use_batch_model the vosk BatchModel/BatchRecognizer API is used and
+    all segments of a batch are decoded together; this needs a vosk build
+    with batch support. Otherwise segments are decoded one after another
+    against the same loaded model.
+    """
+    name = "vosk"
+
+    def __init__(self, model_path: str, use_batch_model: bool = False):
+        try:
+            import vosk
+        except ImportError:
+            raise RuntimeError("The vosk package is required for RECOGNIZER_BACKEND=vosk (pip install vosk)")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self.use_batch_model = use_batch_model
+        self.supports_batching = use_batch_model
+        self.model = vosk.BatchModel(model_path) if use_batch_model else vosk.Model(model_path)
+
+    def recognize(self, pcm: bytes, sample_rate: int) -> str:
+        if self.use_batch_model:
+            return self.recognize_batch([pcm], sample_rate)[0]
+        recognizer = self._vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+    def recognize_batch(self, segments: List[bytes], sample_rate: int) -> List[str]:
+        if not self.use_batch_model:
+            return super().recognize_batch(segments, sample_rate)
+        recognizers = [self._vosk.BatchRecognizer(self.model, sample_rate) for _ in segments]
+        for recognizer, pcm in zip(recognizers, segments):
+            recognizer.AcceptWaveform(pcm)
+            recognizer.FinishStream()
+        self.model.Wait()
+        results = []
+        for recognizer in recognizers:
+            # After FinishStream each Result() call returns the next utterance, then ""
+            texts = []
+            while True:
+                result = recognizer.Result()
+                if not result:
+                    break
+                text = json.loads(result).get("text", "")
+                if text:
+                    texts.append(text)
+            results.append(" ".join(texts))
+        return results
+
+
+class StubBackend(RecognizerBackend):
+    """
+    Deterministic recognizer for tests and local development.
+
+    Segments whose RMS level is below silence_rms are treated as silence;
+    anything else is "recognized" as one placeholder word per half second.
+    """
+    name = "stub"
+    supports_batching = True
+
+    def __init__(self, silence_rms: float = 100.0):
+        self.silence_rms = silence_rms
+
+    def recognize(self, pcm: bytes, sample_rate: int) -> str:
+        return self.recognize_batch([pcm], sample_rate)[0]
+
+    def recognize_batch(self, segments: List[bytes], sample_rate: int) -> List[str]:
+        results = []
+        for pcm in segments:
+            samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2).astype(np.float64)
+            rms = float(np.sqrt(np.mean(samples ** 2))) if samples.size else 0.0
+            if rms < self.silence_rms:
+                results.append("")
+                continue
+            words = max(1, int(len(samples) / sample_rate * 2))
+            results.append(" ".join(f"word{i}" for i in range(words)))
+        return results
+
+
+def create_backend(name: str) -> RecognizerBackend:
+    """Build the recognizer backend named by RECOGNIZER_BACKEND"""
+    if name == "google":
+        return GoogleBackend()
+    if name == "vosk":
+        return VoskBackend(settings.VOSK_MODEL_PATH, settings.VOSK_USE_BATCH_MODEL)
+    if name == "stub":
+        return StubBackend()
+    raise ValueError(f"Unknown recognizer backend: {name}")
+
+
+class BatchingRecognizer:
+    """
+    Async front end to a RecognizerBackend shared by all sessions.
+
+    Requests arriving within max_wait_ms of each other (up to max_batch_size)
+    are handed to the backend as a single recognize_batch call on the
+    processing pool. Backends without batch support get one pool job per
+    request.
+    """
+
+    def __init__(self, backend: RecognizerBackend, pool: ProcessingPool, max_batch_size: int, max_wait_ms: int):
+        self.backend = backend
+        self.pool = pool
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[bytes, int, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Batches in flight; referenced here so they are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+
+    async def recognize(self, pcm: bytes, sample_rate: int) -> str:
+        """
+        Recognize one segment of 16-bit mono PCM.
+
+        Raises:
+            sr.UnknownValueError: No speech was recognized
+            sr.RequestError: The backend failed
+        """
+        self.requests += 1
+        if not self.backend.supports_batching:
+            self.batches += 1
+            text = await self._run_backend(self.backend.recognize, pcm, sample_rate)
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending.append((pcm, sample_rate, future))
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_wait, self._flush)
+            text = await future
+
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+
+        by_rate: Dict[int, List[Tuple[bytes, asyncio.Future]]] = {}
+        for pcm, sample_rate, future in batch:
+            by_rate.setdefault(sample_rate, []).append((pcm, future))
+        for sample_rate, items in by_rate.items():
+            task = asyncio.ensure_future(self._recognize_batch(sample_rate, items))
+            self._tasks.add(task)
+            task.add_done_callback(self._batch_done)
+
+    def _batch_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Recognition batch failed: {task.exception()}")
+
+    async def _recognize_batch(self, sample_rate: int, items: List[Tuple[bytes, asyncio.Future]]) -> None:
+        self.batches += 1
+        try:
+            texts = await self._run_backend(self.backend.recognize_batch, [pcm for pcm, _ in items], sample_rate)
+        except asyncio.CancelledError:
+            for _, future in items:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), text in zip(items, texts):
+            if not future.done():
+                future.set_result(text)
+
+    async def _run_backend(self, func, *args):
+        try:
+            return await self.pool.run(func, *args)
+        except sr.RequestError:
+            raise
+        except Exception as e:
+            logger.error(f"{self.backend.name} recognizer failed: {e}")
+            raise sr.RequestError(f"{self.backend.name} recognizer failed: {e}")
+
+    async def close(self) -> None:
+        """Cancel queued requests and batches still in flight"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _, _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": self.backend.name,
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0,
+        }
+
+
+# Create a singleton instance
+recognition_service = BatchingRecognizer(
+    create_backend(settings.RECOGNIZER_BACKEND),
+    processing_pool,
+    settings.RECOGNIZER_BATCH_SIZE,
+    settings.RECOGNIZER_BATCH_WAIT_MS,
+)
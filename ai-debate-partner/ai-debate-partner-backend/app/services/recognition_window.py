@@ -0,0 +1,180 @@
+import re
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from .acoustic_features import frame_signal, pcm_to_float
+from .vad import SpeechSegment
+
+# Resolution of split points when a window has to be cut inside speech
+SPLIT_FRAME_MS = 20
+# Energy is smoothed over this span so a split lands in a gap, not a single quiet frame
+SPLIT_SMOOTHING_MS = 100
+
+# At most this many words are compared when removing overlap from a transcript
+MAX_OVERLAP_WORDS = 8
+
+_WORD = re.compile(r"[\w']+")
+
+
+class RecognitionWindow(NamedTuple):
+    pcm: bytes
+    start_seconds: float
+    sample_rate: int
+    overlap_seconds: float = 0.0  # leading audio already sent at the end of the previous window
+    pause_count: int = 0  # pauses before speech in this window, taken from the VAD segment gaps
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.pcm) / (2 * self.sample_rate)
+
+
+class WindowAssembler:
+    """
+    Rolling per-session PCM buffer that turns VAD speech segments into
+    recognition windows.
+
+    Segments are joined until the buffer holds at least min_window_seconds
+    and ends at a pause; a short utterance followed by a pause longer than
+    max_hold_seconds is sent on its own rather than waiting for more speech.
+    Unbroken speech longer than max_window_seconds is cut at the quietest
+    point between the minimum and maximum length, and the next window
+    repeats the last overlap_seconds before the cut so a word split there is
+    heard whole at least once (see deduplicate_overlap()).
+
+    The silence between segments never reaches the buffer, so each window
+    also reports the pauses the VAD found before the speech it holds:
+    every segment that follows one ending at a pause, including across
+    windows, counts one.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        min_window_seconds: float,
+        max_window_seconds: float,
+        overlap_seconds: float,
+        max_hold_seconds: float,
+    ):
+        self.sample_rate = sample_rate
+        self.bytes_per_second = 2 * sample_rate
+        self.min_window_bytes = self._to_bytes(min_window_seconds)
+        self.max_window_bytes = max(self.min_window_bytes + 2, self._to_bytes(max_window_seconds))
+        self.overlap_bytes = min(self._to_bytes(overlap_seconds), self.min_window_bytes)
+        self.max_hold_seconds = max_hold_seconds
+
+        self._buffer = bytearray()
+        self._start = 0.0
+        self._end = 0.0  # stream time where the buffered speech ended
+        self._overlap = 0  # bytes at the start of the buffer repeated from the previous window
+        self._at_pause = False
+        self._pause_offsets: List[int] = []  # buffer offsets where speech resumed after a pause
+
+        self.windows_emitted = 0
+        self.segments_received = 0
+
+    def _to_bytes(self, seconds: float) -> int:
+        return 2 * int(seconds * self.sample_rate)
+
+    @property
+    def buffered_seconds(self) -> float:
+        return len(self._buffer) / self.bytes_per_second
+
+    def _emit(self, windows: List[RecognitionWindow], length: int, next_overlap: int = 0) -> None:
+        # Pauses in the repeated overlap were counted by the previous window
+        pauses = sum(1 for offset in self._pause_offsets if self._overlap <= offset < length)
+        windows.append(RecognitionWindow(
+            bytes(self._buffer[:length]),
+            self._start,
+            self.sample_rate,
+            self._overlap / self.bytes_per_second,
+            pauses,
+        ))
+        keep_from = max(0, length - next_overlap)
+        del self._buffer[:keep_from]
+        self._pause_offsets = [offset - keep_from for offset in self._pause_offsets if offset >= keep_from]
+        self._start += keep_from / self.bytes_per_second
+        self._overlap = min(next_overlap, len(self._buffer))
+        self.windows_emitted += 1
+
+    def _split_point(self) -> int:
+        """
+        Byte offset of the quietest spot between the minimum and maximum
+        window length; the latest of equally quiet spots, for longer windows
+        """
+        frame_length = self.sample_rate * SPLIT_FRAME_MS // 1000
+        search = pcm_to_float(bytes(self._buffer[:self.max_window_bytes]))
+        frames = frame_signal(search, frame_length, frame_length)
+        energy = np.mean(frames ** 2, axis=1)
+        span = max(1, SPLIT_SMOOTHING_MS // SPLIT_FRAME_MS)
+        smoothed = np.convolve(energy, np.ones(span) / span, mode="same")
+
+        first = min(len(smoothed) - 1, self.min_window_bytes // (2 * frame_length))
+        candidates = smoothed[first:]
+        quietest = first + int(np.flatnonzero(candidates <= candidates.min() * 1.25 + 1e-12)[-1])
+        return max(self.overlap_bytes + 2, quietest * 2 * frame_length)
+
+    def add(self, segment: SpeechSegment) -> List[RecognitionWindow]:
+        """Buffer a speech segment; returns the windows that are ready"""
+        windows: List[RecognitionWindow] = []
+        resumes_after_pause = self.segments_received > 0 and self._at_pause
+        self.segments_received += 1
+
+        # A long silence since the held speech ends its window, however short
+        if self._buffer and segment.start_seconds - self._end > self.max_hold_seconds:
+            self._emit(windows, len(self._buffer))
+
+        if not self._buffer:
+            self._start = segment.start_seconds
+            self._overlap = 0
+        if resumes_after_pause:
+            self._pause_offsets.append(len(self._buffer))
+        self._buffer.extend(segment.pcm)
+        self._end = segment.end_seconds
+        self._at_pause = segment.ends_at_pause
+
+        while len(self._buffer) > self.max_window_bytes:
+            self._emit(windows, self._split_point(), self.overlap_bytes)
+
+        if self._at_pause and len(self._buffer) >= self.min_window_bytes:
+            self._emit(windows, len(self._buffer))
+        return windows
+
+    def poll(self, position_seconds: float) -> List[RecognitionWindow]:
+        """Release held speech once the silence after it outlasts max_hold_seconds"""
+        windows: List[RecognitionWindow] = []
+        if self._buffer and self._at_pause and position_seconds - self._end > self.max_hold_seconds:
+            self._emit(windows, len(self._buffer))
+        return windows
+
+    def flush(self) -> List[RecognitionWindow]:
+        """Everything still buffered, e.g. when the session ends"""
+        windows: List[RecognitionWindow] = []
+        if self._buffer:
+            self._emit(windows, len(self._buffer))
+        return windows
+
+    def stats(self) -> Dict:
+        return {
+            "segments": self.segments_received,
+            "windows": self.windows_emitted,
+            "buffered_seconds": round(self.buffered_seconds, 2),
+        }
+
+
+def deduplicate_overlap(previous: str, text: str, max_words: int = MAX_OVERLAP_WORDS) -> str:
+    """
+    Drop the leading words of `text` that repeat the end of `previous`.
+
+    Used for windows that start with audio from the end of the previous
+    one: the longest run of up to max_words words that ends `previous` and
+    starts `text` (ignoring case and punctuation) is removed from `text`.
+    """
+    previous_words = [word.lower() for word in _WORD.findall(previous[-200:])]
+    matches = list(_WORD.finditer(text))
+    words = [match.group().lower() for match in matches]
+
+    for size in range(min(max_words, len(previous_words), len(words)), 0, -1):
+        if previous_words[-size:] == words[:size]:
+            return text[matches[size - 1].end():].lstrip(" ,.;:!?")
+    return text
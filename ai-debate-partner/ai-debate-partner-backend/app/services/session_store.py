@@ -0,0 +1,315 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Identifies this server process in live session snapshots
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SessionStore:
+    """
+    Interface for session state shared by every server worker.
+
+    Two kinds of state are kept per session id:
+      history - the summaries of ended sessions, appended in order and kept
+                for history_ttl_seconds after the last append
+      live    - a JSON snapshot of a connected session (transcript, metrics,
+                feedback, owning worker), dropped on disconnect and expiring
+                live_ttl_seconds after the last update if the worker dies
+
+    Connections, audio workers and decoders stay with the process that owns
+    the WebSocket; only serializable state goes through the store. Values
+    must be JSON serializable. Backends log and swallow their own errors so
+    a store outage never ends a debate session.
+    """
+    name = "base"
+
+    def __init__(self, history_ttl_seconds: float, live_ttl_seconds: float):
+        self.history_ttl_seconds = history_ttl_seconds
+        self.live_ttl_seconds = live_ttl_seconds
+        self.writes = 0
+        self.reads = 0
+        self.errors = 0
+
+    async def append_history(self, session_id: str, entry: Dict[str, Any]) -> None:
+        await self._guard("history write", self._append_history(session_id, entry), None)
+
+    async def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        return await self._guard("history read", self._get_history(session_id), [])
+
+    async def put_live(self, session_id: str, state: Dict[str, Any]) -> None:
+        await self._guard("live state write", self._put_live(session_id, {**state, "worker": WORKER_ID}), None)
+
+    async def get_live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self._guard("live state read", self._get_live(session_id), None)
+
+    async def delete_live(self, session_id: str) -> None:
+        await self._guard("live state delete", self._delete_live(session_id), None)
+
+    async def _guard(self, operation: str, call, default):
+        try:
+            result = await call
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Session store {operation} failed: {e}")
+            return default
+        if operation.endswith("read"):
+            self.reads += 1
+        else:
+            self.writes += 1
+        return result
+
+    async def _append_history(self, session_id: str, entry: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def _get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def _put_live(self, session_id: str, state: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def _get_live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def _delete_live(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "worker": WORKER_ID,
+            "writes": self.writes,
+            "reads": self.reads,
+            "errors": self.errors,
+        }
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store; every worker sees only its own sessions"""
+    name = "memory"
+
+    def __init__(self, history_ttl_seconds: float, live_ttl_seconds: float):
+        super().__init__(history_ttl_seconds, live_ttl_seconds)
+        self._history: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self._live: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    async def _append_history(self, session_id: str, entry: Dict[str, Any]) -> None:
+        entries = (await self._get_history(session_id)) + [entry]
+        self._history[session_id] = (time.time() + self.history_ttl_seconds, entries)
+
+    async def _get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        expires_at, entries = self._history.get(session_id, (0.0, []))
+        if expires_at <= time.time():
+            self._history.pop(session_id, None)
+            return []
+        return list(entries)
+
+    async def _put_live(self, session_id: str, state: Dict[str, Any]) -> None:
+        self._live[session_id] = (time.time() + self.live_ttl_seconds, state)
+
+    async def _get_live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        expires_at, state = self._live.get(session_id, (0.0, None))
+        if expires_at <= time.time():
+            self._live.pop(session_id, None)
+            return None
+        return state
+
+    async def _delete_live(self, session_id: str) -> None:
+        self._live.pop(session_id, None)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Store in a SQLite file shared by the workers of one host.
+
+    The file runs in WAL mode so readers never wait for the writer; each
+    process has its own connection, used from a worker thread. Expired rows
+    are deleted by writes, at most once every purge_interval_seconds.
+    """
+    name = "sqlite"
+    purge_interval_seconds = 60.0
+
+    def __init__(self, path: str, history_ttl_seconds: float, live_ttl_seconds: float):
+        super().__init__(history_ttl_seconds, live_ttl_seconds)
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS session_history ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "entry TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_session_history_session_id_id ON session_history (session_id, id)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS live_sessions ("
+                "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def _purge_if_due(self, connection: sqlite3.Connection) -> None:
+        """Delete expired rows (the caller commits); reads only filter them out"""
+        now = time.time()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.purge_interval_seconds
+        connection.execute("DELETE FROM session_history WHERE expires_at <= ?", (now,))
+        connection.execute("DELETE FROM live_sessions WHERE expires_at <= ?", (now,))
+
+    def _execute(self, sql: str, parameters: tuple = (), fetch: bool = False) -> List[tuple]:
+        with self._lock:
+            connection = self._connect()
+            cursor = connection.execute(sql, parameters)
+            if fetch:
+                return cursor.fetchall()
+            self._purge_if_due(connection)
+            connection.commit()
+            return []
+
+    def _append_history_sync(self, session_id: str, entry: str) -> None:
+        expires_at = time.time() + self.history_ttl_seconds
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT INTO session_history (session_id, entry, expires_at) VALUES (?, ?, ?)",
+                (session_id, entry, expires_at),
+            )
+            # The whole history expires together, like a Redis list
+            connection.execute(
+                "UPDATE session_history SET expires_at = ? WHERE session_id = ?", (expires_at, session_id)
+            )
+            self._purge_if_due(connection)
+            connection.commit()
+
+    async def _append_history(self, session_id: str, entry: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._append_history_sync, session_id, json.dumps(entry))
+
+    async def _get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT entry FROM session_history WHERE session_id = ? AND expires_at > ? ORDER BY id",
+            (session_id, time.time()),
+            True,
+        )
+        return [json.loads(entry) for entry, in rows]
+
+    async def _put_live(self, session_id: str, state: Dict[str, Any]) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO live_sessions (session_id, state, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET state = excluded.state, expires_at = excluded.expires_at",
+            (session_id, json.dumps(state), time.time() + self.live_ttl_seconds),
+        )
+
+    async def _get_live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT state FROM live_sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time()),
+            True,
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    async def _delete_live(self, session_id: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM live_sessions WHERE session_id = ?", (session_id,))
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    async def close(self) -> None:
+        # Writers on worker threads may hold the lock; don't wait for it on the event loop
+        await asyncio.to_thread(self._close)
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store in Redis (or any server speaking its protocol, such as Valkey or
+    KeyDB), shared by workers on any number of hosts. History is a list per
+    session, the live snapshot a string key; both expire with their TTLs.
+    """
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str, history_ttl_seconds: float, live_ttl_seconds: float):
+        super().__init__(history_ttl_seconds, live_ttl_seconds)
+        try:
+            import redis.asyncio
+        except ImportError:
+            raise RuntimeError("The redis package is required for SESSION_STORE_BACKEND=redis (pip install redis)")
+        self.url = url
+        self.key_prefix = key_prefix
+        self._client = redis.asyncio.from_url(url, decode_responses=True)
+
+    def _key(self, kind: str, session_id: str) -> str:
+        return f"{self.key_prefix}{kind}:{session_id}"
+
+    async def _append_history(self, session_id: str, entry: Dict[str, Any]) -> None:
+        key = self._key("history", session_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, json.dumps(entry))
+            pipe.expire(key, int(self.history_ttl_seconds))
+            await pipe.execute()
+
+    async def _get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        return [json.loads(entry) for entry in await self._client.lrange(self._key("history", session_id), 0, -1)]
+
+    async def _put_live(self, session_id: str, state: Dict[str, Any]) -> None:
+        await self._client.set(self._key("live", session_id), json.dumps(state), ex=int(self.live_ttl_seconds))
+
+    async def _get_live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        state = await self._client.get(self._key("live", session_id))
+        return json.loads(state) if state is not None else None
+
+    async def _delete_live(self, session_id: str) -> None:
+        await self._client.delete(self._key("live", session_id))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_session_store(name: str) -> SessionStore:
+    """Build the session store named by SESSION_STORE_BACKEND"""
+    if name == "memory":
+        return MemorySessionStore(settings.SESSION_HISTORY_TTL_SECONDS, settings.SESSION_LIVE_TTL_SECONDS)
+    if name == "sqlite":
+        return SQLiteSessionStore(
+            settings.SESSION_STORE_PATH, settings.SESSION_HISTORY_TTL_SECONDS, settings.SESSION_LIVE_TTL_SECONDS
+        )
+    if name == "redis":
+        return RedisSessionStore(
+            settings.SESSION_STORE_REDIS_URL,
+            settings.SESSION_STORE_KEY_PREFIX,
+            settings.SESSION_HISTORY_TTL_SECONDS,
+            settings.SESSION_LIVE_TTL_SECONDS,
+        )
+    raise ValueError(f"Unknown session store backend: {name}")
+
+
+session_store = create_session_store(settings.SESSION_STORE_BACKEND)
@@ -0,0 +1,97 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+
+class RunningMetrics:
+    """
+    Session-wide speech metrics maintained incrementally.
+
+    Each recognized chunk is folded in with update(), which costs
+    O(words in the chunk), and snapshot() returns exact totals for the whole
+    session at any time without re-reading the transcript.
+    """
+
+    def __init__(self):
+        self.word_count = 0
+        self.word_frequencies: Counter = Counter()
+        self.total_word_length = 0
+        self.sentence_count = 0
+        self.filler_word_count = 0
+        self.grammar_errors = 0
+        self.hesitation_count = 0
+        self.speaking_time_seconds = 0.0
+        self.clarity_total = 0.0
+        self.chunk_count = 0
+        self.started_at: Optional[datetime] = None
+        self.updated_at: Optional[datetime] = None
+
+    def update(
+        self,
+        words: Iterable[str],
+        sentence_count: int,
+        filler_word_count: int,
+        grammar_errors: int,
+        hesitation_count: int,
+        duration_seconds: float,
+        clarity_score: float,
+    ) -> None:
+        """Fold one chunk's counts into the session totals"""
+        words = list(words)
+        self.word_count += len(words)
+        self.total_word_length += sum(map(len, words))
+        self.word_frequencies.update(words)
+        self.sentence_count += sentence_count
+        self.filler_word_count += filler_word_count
+        self.grammar_errors += grammar_errors
+        self.hesitation_count += hesitation_count
+        self.speaking_time_seconds += max(0.0, duration_seconds or 0.0)
+        self.clarity_total += clarity_score
+        self.chunk_count += 1
+
+        now = datetime.utcnow()
+        if self.started_at is None:
+            self.started_at = now
+        self.updated_at = now
+
+    @property
+    def unique_words(self) -> int:
+        return len(self.word_frequencies)
+
+    @property
+    def vocabulary_richness(self) -> float:
+        return self.unique_words / (self.word_count or 1)
+
+    @property
+    def avg_word_length(self) -> float:
+        return self.total_word_length / (self.word_count or 1)
+
+    @property
+    def speaking_rate(self) -> float:
+        """Words per minute over the audio received so far"""
+        if self.speaking_time_seconds <= 0:
+            return 0
+        return self.word_count / (self.speaking_time_seconds / 60)
+
+    @property
+    def clarity_score(self) -> float:
+        """Mean clarity over the session's chunks"""
+        return self.clarity_total / (self.chunk_count or 1)
+
+    @property
+    def filler_word_rate(self) -> float:
+        return self.filler_word_count / (self.word_count or 1)
+
+    def snapshot(self) -> Dict:
+        return {
+            "word_count": self.word_count,
+            "unique_words": self.unique_words,
+            "vocabulary_richness": self.vocabulary_richness,
+            "avg_word_length": self.avg_word_length,
+            "sentence_count": self.sentence_count,
+            "filler_word_count": self.filler_word_count,
+            "grammar_errors": self.grammar_errors,
+            "hesitation_count": self.hesitation_count,
+            "speaking_rate": self.speaking_rate,
+            "speaking_time_seconds": self.speaking_time_seconds,
+        }
@@ -4,7 +4,11 @@ from pydub import AudioSegment
 import io
 import tempfile
 import os
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
+
+from ..core.config import settings
+from .acoustic_features import extract_features
+from .recognition import recognition_service
 
 class SpeechRecognizer:
     def __init__(self):
@@ -14,7 +18,7 @@ class SpeechRecognizer:
 
     async def recognize_audio(self, audio_file) -> Tuple[Optional[str], Optional[float]]:
         """
-        Convert audio file to text using Google Speech Recognition
+        Convert audio file to text with the configured recognizer backend
         
         Args:
             audio_file: File-like object containing audio data
@@ -47,18 +51,16 @@ class SpeechRecognizer:
                     # Listen for the data (load audio to memory)
                     audio_data = self.recognizer.record(source)
                     
-                    # Recognize (convert from speech to text)
-                    text = self.recognizer.recognize_google(
-                        audio_data,
-                        show_all=False  # Set to True to get all possible transcripts
-                    )
-                    
-                    # For now, we'll use a placeholder confidence score
-                    # In a production environment, you might want to use a different recognizer
-                    # that provides confidence scores, or implement your own scoring mechanism
-                    confidence = 0.8  # Placeholder confidence score
-                    
-                    return text, confidence
+                # Recognize (convert from speech to text)
+                pcm = audio_data.get_raw_data(convert_rate=settings.AUDIO_SAMPLE_RATE, convert_width=2)
+                text = await recognition_service.recognize(pcm, settings.AUDIO_SAMPLE_RATE)
+                
+                # For now, we'll use a placeholder confidence score
+                # In a production environment, you might want to use a different recognizer
+                # that provides confidence scores, or implement your own scoring mechanism
+                confidence = 0.8  # Placeholder confidence score
+                
+                return text, confidence
                     
             finally:
                 # Clean up temporary files
@@ -70,29 +72,38 @@ class SpeechRecognizer:
             return None, 0.0
             
         except sr.RequestError as e:
-            logging.error(f"Could not request results from Google Speech Recognition service; {e}")
+            logging.error(f"Could not request results from the speech recognition backend; {e}")
             return None, 0.0
             
         except Exception as e:
             logging.error(f"Error in speech recognition: {str(e)}")
             return None, 0.0
 
-    def calculate_voice_metrics(self, audio_file) -> Dict[str, float]:
+    def calculate_voice_metrics(self, audio_file, word_count: Optional[int] = None) -> Dict[str, Optional[float]]:
         """
         Calculate voice metrics like clarity, volume, etc.
         
         Args:
             audio_file: File-like object containing audio data
+            word_count: Words spoken in the audio, if already transcribed
             
         Returns:
             Dictionary containing voice metrics
         """
-        # Placeholder implementation
-        # In a real implementation, you would analyze the audio file
-        # to calculate these metrics
+        # Decode to the same mono 16-bit PCM the live pipeline analyzes
+        audio = AudioSegment.from_file(audio_file)
+        audio = audio.set_channels(1).set_frame_rate(settings.AUDIO_SAMPLE_RATE).set_sample_width(2)
+        features = extract_features(audio.raw_data, settings.AUDIO_SAMPLE_RATE)
+        
+        speech_rate = None
+        if word_count is not None and features.duration_seconds > 0:
+            speech_rate = word_count / (features.duration_seconds / 60)  # words per minute
+        
         return {
-            "clarity": 7.5,  # 0-10 scale
-            "volume": 8.0,    # 0-10 scale
-            "pitch_variation": 6.8,  # 0-10 scale
-            "speech_rate": 150  # words per minute
+            "clarity": features.clarity_score,  # 0-10 scale
+            "volume": features.volume_score,    # 0-10 scale
+            "pitch_variation": features.pitch_variation_score,  # 0-10 scale
+            "voiced_ratio": features.voiced_ratio,
+            "pause_count": len(features.interior_pauses),
+            "speech_rate": speech_rate  # words per minute
         }
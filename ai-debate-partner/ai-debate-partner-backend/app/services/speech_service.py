@@ -5,8 +5,8 @@ from pydub import AudioSegment
 from fastapi import UploadFile, HTTPException
 from typing import Tuple
 import numpy as np
-import librosa
 from ..core.config import settings
+from .recognition import recognition_service
 
 class SpeechService:
     def __init__(self):
@@ -60,6 +60,10 @@ class SpeechService:
     
     def _get_audio_duration(self, audio_path: str) -> float:
         """Get duration of audio file in seconds."""
+        try:
+            import librosa
+        except ImportError:
+            raise RuntimeError("The librosa package is required to analyze uploaded audio (pip install librosa)")
         try:
             y, sr = librosa.load(audio_path, sr=None)
             return float(len(y)) / float(sr)
@@ -67,12 +71,12 @@ class SpeechService:
             raise Exception(f"Failed to get audio duration: {str(e)}")
     
     async def _transcribe_audio(self, audio_path: str) -> str:
-        """Transcribe audio file to text using Google Speech Recognition."""
+        """Transcribe audio file to text with the configured recognizer backend."""
         try:
             with sr.AudioFile(audio_path) as source:
                 audio_data = self.recognizer.record(source)
-                text = self.recognizer.recognize_google(audio_data)
-                return text
+            pcm = audio_data.get_raw_data(convert_rate=settings.AUDIO_SAMPLE_RATE, convert_width=2)
+            return await recognition_service.recognize(pcm, settings.AUDIO_SAMPLE_RATE)
         except sr.UnknownValueError:
             raise Exception("Could not understand audio")
         except sr.RequestError as e:
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.config import settings
+from ..models.database import SessionLocal
+from ..models.models import AnalysisType, Feedback, Session
+from .analytics_rollup import ScorePoint, record_scores
+
+logger = logging.getLogger(__name__)
+
+
+def _clamp_score(score: float) -> float:
+    return round(max(0.0, min(10.0, float(score))), 2)
+
+
+def category_scores(metrics: Dict[str, Any]) -> Dict[AnalysisType, float]:
+    """0-10 score per analysis category from a session's final live metrics"""
+    sentence_count = metrics.get("sentence_count") or 1
+    return {
+        AnalysisType.GRAMMAR: _clamp_score((1 - metrics.get("grammar_errors", 0) / sentence_count) * 10),
+        AnalysisType.VOCABULARY: _clamp_score(metrics.get("vocabulary_richness", 0) * 10),
+        AnalysisType.CONFIDENCE: _clamp_score(metrics.get("confidence_score", 0)),
+        AnalysisType.FLUENCY: _clamp_score(metrics.get("fluency_score", 0)),
+        AnalysisType.OVERALL: _clamp_score(metrics.get("overall_score", 0)),
+    }
+
+
+def category_feedback(metrics: Dict[str, Any], feedback: Dict[str, List[str]]) -> Dict[AnalysisType, str]:
+    return {
+        AnalysisType.GRAMMAR: f"{metrics.get('grammar_errors', 0)} potential grammar issues in {metrics.get('sentence_count', 0)} sentences.",
+        AnalysisType.VOCABULARY: f"Vocabulary richness {metrics.get('vocabulary_richness', 0):.2f} over {metrics.get('word_count', 0)} words.",
+        AnalysisType.CONFIDENCE: f"Speaking rate {metrics.get('speaking_rate', 0):.0f} words per minute.",
+        AnalysisType.FLUENCY: f"{metrics.get('filler_word_count', 0)} filler words.",
+        AnalysisType.OVERALL: " ".join(feedback.get("strengths", []) + feedback.get("areas_for_improvement", [])),
+    }
+
+
+class SummaryWriter:
+    """
+    Persists live session summaries without putting the database on the
+    WebSocket path.
+
+    submit() only enqueues. A background task collects up to batch_size
+    summaries, waiting at most flush_interval_ms after the first one, and
+    writes each batch (a Session row plus one Feedback row per analysis
+    category for every summary) in a single transaction on a worker thread.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        batch_size: int,
+        flush_interval_ms: int,
+        max_queued: int,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._task = asyncio.create_task(self._run())
+
+    def submit(
+        self,
+        live_session_id: str,
+        summary: Dict[str, Any],
+        metrics: Dict[str, Any],
+        feedback: Dict[str, List[str]],
+        user_id: Optional[str] = None,
+    ) -> bool:
+        """Queue a finished session for writing; False if it had to be dropped"""
+        if self._queue is None:
+            logger.error(f"Summary writer not started; session {live_session_id} not persisted")
+            self.dropped += 1
+            return False
+        try:
+            self._queue.put_nowait({
+                "live_session_id": live_session_id,
+                "summary": summary,
+                "metrics": dict(metrics),
+                "feedback": feedback,
+                "user_id": user_id,
+                "ended_at": datetime.utcnow(),
+            })
+        except asyncio.QueueFull:
+            logger.error(f"Summary writer backlog full; session {live_session_id} not persisted")
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._write(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to persist {len(batch)} session summaries: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Blocking: insert the whole batch in one transaction"""
+        db = self.session_factory()
+        try:
+            points = []
+            for item in batch:
+                summary = item["summary"]
+                session_id = str(uuid.uuid4())
+                db.add(Session(
+                    id=session_id,
+                    user_id=item["user_id"],
+                    title=f"Live debate {item['live_session_id']}",
+                    duration_seconds=int(summary.get("duration_minutes", 0) * 60),
+                    created_at=item["ended_at"],
+                    live_session_id=item["live_session_id"],
+                    summary=summary,
+                ))
+                texts = category_feedback(item["metrics"], item["feedback"])
+                for analysis_type, score in category_scores(item["metrics"]).items():
+                    db.add(Feedback(
+                        session_id=session_id,
+                        analysis_type=analysis_type,
+                        score=score,
+                        feedback=texts[analysis_type],
+                        suggestions=list(item["feedback"].get("suggestions", [])) if analysis_type == AnalysisType.OVERALL else [],
+                        created_at=item["ended_at"],
+                    ))
+                    points.append(ScorePoint(item["user_id"], analysis_type, item["ended_at"], score))
+            record_scores(db, points)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def stop(self) -> None:
+        """Write everything still queued, then stop the background task"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "submitted": self.submitted,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+summary_writer = SummaryWriter(
+    SessionLocal,
+    settings.SUMMARY_WRITE_BATCH_SIZE,
+    settings.SUMMARY_WRITE_INTERVAL_MS,
+    settings.SUMMARY_WRITE_MAX_QUEUED,
+)
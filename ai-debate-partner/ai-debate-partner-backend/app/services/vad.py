@@ -0,0 +1,180 @@
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+
+from .acoustic_features import find_runs, frame_signal, pcm_to_float
+
+# Non-overlapping 20 ms decision frames
+FRAME_MS = 20
+
+# Frames below this level (dBFS) are never speech, however quiet the room
+ABSOLUTE_FLOOR_DB = -55.0
+# Noise floor estimate before any audio has been seen, and how fast it may rise
+INITIAL_NOISE_FLOOR_DB = -60.0
+NOISE_FLOOR_RISE_DB_PER_SECOND = 3.0
+# Zero-crossing rate (crossings per sample) typical of unvoiced fricatives ("s", "f")
+FRICATIVE_ZCR = 0.3
+
+_EPSILON = 1e-10
+
+
+class SpeechSegment(NamedTuple):
+    pcm: bytes
+    start_seconds: float  # stream time of the first sample, from the start of the session
+    sample_rate: int
+    ends_at_pause: bool = True  # False when cut at max_segment_seconds in unbroken speech
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.pcm) / (2 * self.sample_rate)
+
+    @property
+    def end_seconds(self) -> float:
+        return self.start_seconds + self.duration_seconds
+
+
+class VoiceActivityDetector:
+    """
+    Streaming energy / zero-crossing voice activity detector for one session.
+
+    feed() takes decoded 16-bit mono PCM in arbitrary pieces and returns the
+    speech segments that ended in it. A segment that is still going at the
+    end of a piece is held and continued by the next one, so words spanning
+    chunk boundaries reach the recognizer whole. Each segment starts with a
+    short pre-roll (never overlapping the previous segment) and ends after a
+    hangover, so soft onsets and trailing consonants are kept. Silence between segments is never returned.
+
+    Decisions are made per 20 ms frame with whole-array NumPy operations;
+    a frame is speech when its energy clears the adaptive noise floor by
+    energy_margin_db, or nearly does and it has a fricative-like
+    zero-crossing rate.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        energy_margin_db: float,
+        hangover_ms: int,
+        preroll_ms: int,
+        max_segment_seconds: float,
+    ):
+        self.sample_rate = sample_rate
+        self.energy_margin_db = energy_margin_db
+        self.frame_length = sample_rate * FRAME_MS // 1000
+        self.frame_bytes = 2 * self.frame_length
+        self.hangover_frames = max(0, hangover_ms // FRAME_MS)
+        self.preroll_bytes = self.frame_bytes * max(0, preroll_ms // FRAME_MS)
+        self.max_segment_bytes = self.frame_bytes * max(1, int(max_segment_seconds * 1000) // FRAME_MS)
+
+        self.noise_floor_db = INITIAL_NOISE_FLOOR_DB
+        self._remainder = b""
+        self._tail = b""  # most recent audio, for the next segment's pre-roll
+        self._segment = bytearray()
+        self._segment_start = 0.0
+        self._emitted_until = 0.0  # stream time of the end of the last emitted segment
+        self._silent_frames = self.hangover_frames + 1  # frames since the last speech frame
+        self._frames_seen = 0
+
+        self.active_frames = 0
+        self.segments_emitted = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._segment)
+
+    @property
+    def position_seconds(self) -> float:
+        """Stream time of the end of the audio analyzed so far"""
+        return self._time(0)
+
+    def _time(self, frame_index: int) -> float:
+        return float(self._frames_seen + frame_index) * FRAME_MS / 1000
+
+    def _emit(self, segments: List[SpeechSegment], length: int, ends_at_pause: bool = True) -> None:
+        segments.append(SpeechSegment(bytes(self._segment[:length]), self._segment_start, self.sample_rate, ends_at_pause))
+        del self._segment[:length]
+        self._segment_start += length / (2 * self.sample_rate)
+        self._emitted_until = self._segment_start
+        self.segments_emitted += 1
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        """Per-frame speech decision, updating the noise floor"""
+        rms_db = 20 * np.log10(np.sqrt(np.mean(frames ** 2, axis=1)) + _EPSILON)
+        crossings = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+
+        # The floor follows quiet stretches down at once but rises only slowly,
+        # so a long utterance is not mistaken for a louder room
+        quiet_db = float(np.percentile(rms_db, 10))
+        rise = NOISE_FLOOR_RISE_DB_PER_SECOND * len(frames) * FRAME_MS / 1000
+        self.noise_floor_db = min(quiet_db, self.noise_floor_db + rise)
+
+        threshold = max(ABSOLUTE_FLOOR_DB, self.noise_floor_db + self.energy_margin_db)
+        loud = rms_db > threshold
+        fricative = (rms_db > threshold - self.energy_margin_db / 2) & (crossings > FRICATIVE_ZCR)
+        return loud | fricative
+
+    def feed(self, pcm: bytes) -> List[SpeechSegment]:
+        """Add decoded audio; returns the speech segments completed by it"""
+        data = self._remainder + bytes(pcm)
+        n_frames = len(data) // self.frame_bytes
+        self._remainder = data[n_frames * self.frame_bytes:]
+        data = data[:n_frames * self.frame_bytes]
+        if n_frames == 0:
+            return []
+
+        frames = frame_signal(pcm_to_float(data), self.frame_length, self.frame_length)
+        speech = self._classify(frames)
+
+        # Hangover: a frame stays active until hangover_frames after the last speech frame,
+        # carrying the count over from the previous piece
+        index = np.arange(n_frames)
+        last_speech = np.maximum.accumulate(np.where(speech, index, -1 - self._silent_frames))
+        active = index - last_speech <= self.hangover_frames
+        self._silent_frames = int(n_frames - 1 - last_speech[-1])
+        self.active_frames += int(active.sum())
+
+        segments: List[SpeechSegment] = []
+        if self._segment and not active[0]:
+            self._emit(segments, len(self._segment))
+
+        for start, end in find_runs(active):
+            if not self._segment:
+                # The pre-roll never reaches back into audio already sent with the previous segment
+                gap_frames = round((self._time(start) - self._emitted_until) * 1000 / FRAME_MS)
+                preroll_bytes = min(self.preroll_bytes, max(0, gap_frames) * self.frame_bytes)
+                preroll = (self._tail + data[:start * self.frame_bytes])[-preroll_bytes:] if preroll_bytes else b""
+                self._segment_start = self._time(start) - len(preroll) / (2 * self.sample_rate)
+                self._segment.extend(preroll)
+            self._segment.extend(data[start * self.frame_bytes:end * self.frame_bytes])
+
+            # Bound latency and recognizer request size on long unbroken speech
+            while len(self._segment) > self.max_segment_bytes:
+                self._emit(segments, self.max_segment_bytes, ends_at_pause=False)
+            if end < n_frames and self._segment:
+                self._emit(segments, len(self._segment))
+
+        if self.preroll_bytes:
+            self._tail = (self._tail + data)[-self.preroll_bytes:]
+        self._frames_seen += n_frames
+        return segments
+
+    def flush(self) -> List[SpeechSegment]:
+        """Return the segment still in progress, e.g. when the session ends"""
+        segments: List[SpeechSegment] = []
+        if self._segment:
+            self._emit(segments, len(self._segment))
+        return segments
+
+    def drop_segment(self) -> None:
+        """Discard the segment in progress, e.g. after audio was lost in between"""
+        self._segment.clear()
+        self._silent_frames = self.hangover_frames + 1
+
+    def stats(self) -> Dict:
+        seconds_seen = self._frames_seen * FRAME_MS / 1000
+        return {
+            "seconds_seen": round(seconds_seen, 2),
+            "speech_seconds": round(self.active_frames * FRAME_MS / 1000, 2),
+            "segments": self.segments_emitted,
+            "noise_floor_db": round(self.noise_floor_db, 1),
+        }
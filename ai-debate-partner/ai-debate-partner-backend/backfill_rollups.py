@@ -0,0 +1,36 @@
+"""
+Rebuild the per-day analytics rollup from existing feedback.
+
+    python backfill_rollups.py
+
+New feedback keeps the rollup up to date on insert; run this once after
+upgrading a database that already holds sessions, or whenever feedback
+rows were changed outside the API.
+"""
+import sys
+import time
+
+from app.models import create_tables
+from app.models.database import SessionLocal
+from app.services.analytics_rollup import backfill
+
+
+def main() -> int:
+    create_tables()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rows = backfill(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Backfill failed: {e}")
+        return 1
+    finally:
+        db.close()
+    print(f"Wrote {rows} rollup rows in {time.perf_counter() - start:.2f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
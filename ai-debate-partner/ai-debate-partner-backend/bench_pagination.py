@@ -0,0 +1,117 @@
+"""
+Session listing page latency, offset vs keyset pagination.
+
+    python bench_pagination.py                      # 1M sessions, 100 users
+    python bench_pagination.py --sessions 200000 --keep bench.db
+
+Builds a throwaway SQLite database with the app's schema and indexes, then
+times one page at increasing depths for the all-sessions and per-user
+listings, using the same queries as the API endpoints.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session as OrmSession, selectinload
+
+from app.models.database import Base
+from app.models.models import Session
+from app.services.pagination import format_cursor, paginate_sessions
+
+
+def populate(engine, sessions: int, users: int) -> None:
+    start = datetime(2024, 1, 1)
+    span = 365 * 86400
+    with engine.begin() as connection:
+        for offset in range(0, sessions, 50000):
+            rows = []
+            for _ in range(min(50000, sessions - offset)):
+                created_at = start + timedelta(seconds=random.uniform(0, span))
+                rows.append((
+                    str(uuid.uuid4()),
+                    f"user-{random.randrange(users)}",
+                    "Benchmark debate",
+                    300,
+                    created_at.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                ))
+            connection.exec_driver_sql(
+                "INSERT INTO sessions (id, user_id, title, duration_seconds, created_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+
+
+def time_page(db: OrmSession, query, repeat: int) -> float:
+    """Median milliseconds to load one page"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.scalars(query).all()
+        timings.append((time.perf_counter() - start) * 1000)
+        db.expunge_all()
+    return statistics.median(timings)
+
+
+def bench(db: OrmSession, label: str, base_query, total: int, limit: int, repeat: int) -> None:
+    print(f"\n{label} ({total} rows)")
+    print(f"{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+    query = base_query.options(selectinload(Session.feedbacks))
+    depths = [0]
+    while depths[-1] * 10 < total:
+        depths.append(max(100, depths[-1] * 10))
+    depths.append(total - limit)
+    for depth in sorted(set(d for d in depths if 0 <= d < total)):
+        offset_ms = time_page(db, paginate_sessions(query, limit, skip=depth), repeat)
+        if depth:
+            # The cursor a client would hold after reading `depth` rows
+            previous = db.scalars(paginate_sessions(base_query, 1, skip=depth - 1)).one()
+            after = format_cursor(previous)
+            db.expunge_all()
+        else:
+            after = None
+        keyset_ms = time_page(db, paginate_sessions(query, limit, after=after), repeat)
+        print(f"{depth:>10} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", help="database file to build (or reuse) instead of a temporary one")
+    args = parser.parse_args()
+
+    path = args.keep or os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    exists = os.path.exists(path)
+    Base.metadata.create_all(bind=engine)
+    if not exists:
+        print(f"Inserting {args.sessions} sessions into {path}...")
+        start = time.perf_counter()
+        populate(engine, args.sessions, args.users)
+        print(f"Done in {time.perf_counter() - start:.1f}s")
+
+    try:
+        with OrmSession(engine) as db:
+            total = db.query(Session).count()
+            bench(db, "All sessions", select(Session), total, args.limit, args.repeat)
+            user_id = "user-0"
+            user_total = db.query(Session).filter(Session.user_id == user_id).count()
+            bench(db, f"Sessions of {user_id}", select(Session).where(Session.user_id == user_id), user_total, args.limit, args.repeat)
+    finally:
+        engine.dispose()
+        if not args.keep:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
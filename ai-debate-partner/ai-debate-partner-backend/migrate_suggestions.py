@@ -0,0 +1,39 @@
+"""
+Convert feedback suggestions stored as comma-joined text to JSON lists.
+
+    python migrate_suggestions.py
+
+Feedback.suggestions is a JSON column; rows written before that change hold
+plain text such as "a,b" that would fail to load. Run this once after
+upgrading. Rows that already hold a JSON list are left alone, so it is safe
+to run again.
+"""
+import json
+import sys
+
+from sqlalchemy import text
+
+from app.models.database import engine
+
+
+def split_legacy(value) -> list:
+    return [part.strip() for part in str(value).split(",") if part.strip()] if value else []
+
+
+def main() -> int:
+    with engine.begin() as connection:
+        rows = connection.execute(text(
+            "SELECT id, suggestions FROM feedbacks "
+            "WHERE (CASE WHEN json_valid(suggestions) THEN json_type(suggestions) END) IS NOT 'array'"
+        )).fetchall()
+        if rows:
+            connection.execute(
+                text("UPDATE feedbacks SET suggestions = :suggestions WHERE id = :id"),
+                [{"id": row_id, "suggestions": json.dumps(split_legacy(value))} for row_id, value in rows],
+            )
+    print(f"Converted {len(rows)} feedback rows.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
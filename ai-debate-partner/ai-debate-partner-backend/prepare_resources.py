@@ -0,0 +1,67 @@
+"""
+One-time preparation of runtime resources.
+
+    python prepare_resources.py           # download NLTK corpora into NLTK_DATA_DIR
+    python prepare_resources.py --check   # verify resources and the cold import budget
+
+Run this once after installing requirements (and on build machines with
+network access); the server itself never downloads anything.
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+from app.core.config import settings
+from app.core.resources import download_nltk_resources, verify_resources
+
+
+def measure_import_time() -> float:
+    """Seconds for a fresh interpreter to import app.main"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def prepare() -> int:
+    print(f"Downloading NLTK data into {settings.NLTK_DATA_DIR}...")
+    failed = download_nltk_resources()
+    if failed:
+        print(f"Failed to download: {', '.join(failed)}")
+        return 1
+    print("NLTK data ready.")
+    return 0
+
+
+def check() -> int:
+    status = verify_resources()
+    ok = True
+
+    if status["nltk_missing"]:
+        print(f"Missing NLTK data: {', '.join(status['nltk_missing'])}")
+        ok = False
+    else:
+        print("NLTK data: ok")
+
+    if status["ffmpeg"]:
+        print(f"FFmpeg: {status['ffmpeg']}")
+    else:
+        print(f"FFmpeg: not found at {settings.FFMPEG_PATH}")
+        ok = False
+
+    # Warm run first so the measurement is not dominated by bytecode compilation
+    measure_import_time()
+    elapsed = measure_import_time()
+    budget = settings.IMPORT_TIME_BUDGET_SECONDS
+    print(f"Cold import of app.main: {elapsed:.2f}s (budget {budget:.2f}s)")
+    if elapsed > budget:
+        ok = False
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="verify resources and the import time budget")
+    args = parser.parse_args()
+    sys.exit(check() if args.check else prepare())
@@ -135,6 +135,24 @@ function TabPanel(props) {
   );
 }
 
+// Binary audio frame: version, MIME length, sequence, duration (ms), MIME type, audio bytes
+// (mirrors app/services/audio_protocol.py on the backend)
+const AUDIO_FRAME_VERSION = 1;
+const AUDIO_FRAME_HEADER_SIZE = 10;
+
+const encodeAudioFrame = (sequence, durationMs, mimeType, audioBuffer) => {
+  const mimeBytes = new TextEncoder().encode(mimeType);
+  const frame = new Uint8Array(AUDIO_FRAME_HEADER_SIZE + mimeBytes.length + audioBuffer.byteLength);
+  const header = new DataView(frame.buffer);
+  header.setUint8(0, AUDIO_FRAME_VERSION);
+  header.setUint8(1, mimeBytes.length);
+  header.setUint32(2, sequence >>> 0);
+  header.setUint32(6, Math.round(durationMs) >>> 0);
+  frame.set(mimeBytes, AUDIO_FRAME_HEADER_SIZE);
+  frame.set(new Uint8Array(audioBuffer), AUDIO_FRAME_HEADER_SIZE + mimeBytes.length);
+  return frame.buffer;
+};
+
 const DebateAnalyzer = () => {
   const [isRecording, setIsRecording] = useState(false);
   const [isAnalyzing, setIsAnalyzing] = useState(false);
@@ -176,6 +194,8 @@ const DebateAnalyzer = () => {
   const analyserRef = useRef(null);
   const animationFrameRef = useRef(null);
   const audioChunksRef = useRef([]);
+  const audioSequenceRef = useRef(0);
+  const throttledUntilRef = useRef(0);
 
   // Log MIME type support
   useEffect(() => {
@@ -241,6 +261,10 @@ const DebateAnalyzer = () => {
               setError({ severity: 'warning', message: data.message });
               setIsAnalyzing(false);
               break;
+            case 'throttle':
+              // Keep buffering locally; the backlog is sent as one frame once the server catches up
+              throttledUntilRef.current = Date.now() + (data.retry_after_ms || 2000);
+              break;
             case 'connection_ack':
               console.log('Connection acknowledged');
               break;
@@ -325,6 +349,8 @@ const DebateAnalyzer = () => {
         session_summary: null,
       });
       audioChunksRef.current = [];
+      audioSequenceRef.current = 0;
+      throttledUntilRef.current = 0;
 
       const stream = await navigator.mediaDevices.getUserMedia({
         audio: {
@@ -366,7 +392,11 @@ const DebateAnalyzer = () => {
         if (event.data.size > 0) {
           audioChunksRef.current.push(event.data);
           console.log('Audio chunk size:', event.data.size);
-          if (audioChunksRef.current.length >= 15 && wsRef.current?.readyState === WebSocket.OPEN) { // Wait for 5 chunks (5 seconds)
+          if (
+            audioChunksRef.current.length >= 15 &&
+            Date.now() >= throttledUntilRef.current &&
+            wsRef.current?.readyState === WebSocket.OPEN
+          ) { // Wait for 5 chunks (5 seconds)
             setIsAnalyzing(true);
             try {
               const audioBlob = new Blob(audioChunksRef.current, { type: selectedMimeType });
@@ -376,19 +406,11 @@ const DebateAnalyzer = () => {
                 return;
               }
               const arrayBuffer = await audioBlob.arrayBuffer();
-              const base64String = btoa(
-                new Uint8Array(arrayBuffer).reduce((data, byte) => data + String.fromCharCode(byte), '')
-              );
               audioChunksRef.current = [];
               const duration = 15; // Approximate duration of 5 chunks
 
               wsRef.current.send(
-                JSON.stringify({
-                  type: 'audio_chunk',
-                  data: base64String,
-                  duration_seconds: duration,
-                  mime_type: selectedMimeType,
-                })
+                encodeAudioFrame(audioSequenceRef.current++, duration * 1000, selectedMimeType, arrayBuffer)
               );
             } catch (err) {
               setError({ severity: 'error', message: `Error processing audio: ${err.message}` });